@@ -0,0 +1,290 @@
+"""
+Load test the API over real HTTP and report latency percentiles per route
+
+Usage:
+    uv run python -m benchmarks.api_load --in-memory --books 10000 --duration 30
+    uv run python -m benchmarks.api_load --mongo-url mongodb://localhost:27017
+
+The API runs under uvicorn in a separate process, seeded with a synthetic
+catalog and change log. --in-memory uses mongomock instead of a MongoDB
+server (it ships with the dev dependencies, `uv sync`); --mongo-url seeds
+the MONGO_DB_NAME database ("bookscrapper_bench" by default), dropping
+whatever it held. API-key validation and rate limiting are switched off in
+the server so they do not skew the results.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import socket
+import time
+from datetime import datetime, timedelta
+
+import aiohttp
+from bson import ObjectId
+
+ROUTES = {
+    "list_books": "GET /books",
+    "get_book": "GET /books/{book_id}",
+    "list_changes": "GET /changes",
+}
+CATEGORIES = 50
+
+
+def book_object_id(index: int) -> ObjectId:
+    return ObjectId(f"{index:024x}")
+
+
+def seed(books_collection, changes_collection, books: int, changes: int):
+    """Replace the collections' contents with a synthetic catalog"""
+    books_collection.delete_many({})
+    changes_collection.delete_many({})
+
+    now = datetime.now()
+    batch = []
+    for i in range(books):
+        price = 10 + (i * 7919 % 5000) / 100
+        upc = f"{i:016x}"
+        batch.append(
+            {
+                "_id": book_object_id(i),
+                "upc": upc,
+                "title": f"Book {i}",
+                "category": f"Category {i % CATEGORIES}",
+                "ratings": i % 5 + 1,
+                "price": price,
+                "cover": f"https://books.toscrape.com/media/cache/{i}.jpg",
+                "description": f"Synthetic description for book {i}. " * 8,
+                "scraped_at": now,
+                "information": {
+                    "UPC": upc,
+                    "Product Type": "Books",
+                    "Price (excl. tax)": f"£{price:.2f}",
+                    "Price (incl. tax)": f"£{price:.2f}",
+                    "Tax": "£0.00",
+                    "Availability": f"In stock ({i % 23} available)",
+                    "Number of reviews": str(i % 7),
+                },
+            }
+        )
+        if len(batch) == 1000:
+            books_collection.insert_many(batch)
+            batch = []
+    if batch:
+        books_collection.insert_many(batch)
+
+    batch = []
+    for i in range(changes):
+        book = i % max(books, 1)
+        batch.append(
+            {
+                "book_id": str(book_object_id(book)),
+                "book_title": f"Book {book}",
+                "change_type": "price_change" if i % 3 else "new_book",
+                "old_value": 10.0 if i % 3 else None,
+                "new_value": 12.5 if i % 3 else None,
+                "timestamp": now - timedelta(seconds=changes - i),
+            }
+        )
+        if len(batch) == 1000:
+            changes_collection.insert_many(batch)
+            batch = []
+    if batch:
+        changes_collection.insert_many(batch)
+
+
+def serve(args, port: int):
+    """Configure, seed and run the API (runs in the server process)"""
+    import uvicorn
+
+    from src.api import auth
+    from src.api.app import app
+    from src.api.rate_limit import limiter
+    from src.database import db
+
+    if args.in_memory:
+        try:
+            import mongomock
+        except ImportError:
+            raise SystemExit("--in-memory requires mongomock to be installed")
+
+        db.use_database(mongomock.MongoClient()["books"])
+        db.create_indexes()
+    else:
+        os.environ["MONGO_URL"] = args.mongo_url
+        os.environ.setdefault("MONGO_DB_NAME", "bookscrapper_bench")
+        db.init_db(profile="api")
+
+    seed(db.books_collection, db.changes_collection, args.books, args.changes)
+
+    limiter.enabled = False
+    app.dependency_overrides[auth.get_api_key] = lambda: "load-test"
+
+    uvicorn.run(
+        app,
+        host="127.0.0.1",
+        port=port,
+        lifespan="off",
+        log_level="warning",
+        access_log=False,
+    )
+
+
+def build_request(route: str, args, rng: random.Random) -> str:
+    if route == "list_books":
+        params = [
+            f"page={rng.randint(1, 5)}",
+            f"sort_by={rng.choice(['rating', 'price', 'reviews', 'title'])}",
+        ]
+        if rng.random() < 0.5:
+            params.append(f"category=Category%20{rng.randrange(CATEGORIES)}")
+        if rng.random() < 0.3:
+            params.append(f"min_price={rng.randint(10, 40)}")
+        return "/books/?" + "&".join(params)
+    if route == "get_book":
+        return f"/books/{book_object_id(rng.randrange(args.books))}"
+    if route == "list_changes":
+        change_type = rng.choice(
+            ["", "&change_type=new_book", "&change_type=price_change"]
+        )
+        return f"/changes/?limit={rng.choice([20, 50, 100])}{change_type}"
+    raise ValueError(f"Unknown route: {route}")
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        route, weight = part.split("=")
+        if route not in ROUTES:
+            raise SystemExit(f"Unknown route in --mix: {route}")
+        weights[route] = float(weight)
+    return weights
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, round(q / 100 * (len(values) - 1)))
+    return values[index]
+
+
+async def generate_load(base_url: str, args) -> dict:
+    mix = parse_mix(args.mix)
+    routes, weights = list(mix), list(mix.values())
+    latencies = {route: [] for route in routes}
+    errors = {route: 0 for route in routes}
+    deadline = time.perf_counter() + args.duration
+
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(base_url, connector=connector) as session:
+
+        async def worker(worker_id: int):
+            rng = random.Random(args.seed + worker_id)
+            while time.perf_counter() < deadline:
+                route = rng.choices(routes, weights)[0]
+                path = build_request(route, args, rng)
+                start = time.perf_counter()
+                try:
+                    async with session.get(path) as response:
+                        await response.read()
+                        ok = response.status == 200
+                except aiohttp.ClientError:
+                    ok = False
+                latencies[route].append((time.perf_counter() - start) * 1000)
+                if not ok:
+                    errors[route] += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+    report = {}
+    for route in routes:
+        values = sorted(latencies[route])
+        report[ROUTES[route]] = {
+            "requests": len(values),
+            "errors": errors[route],
+            "throughput_rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 50), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+            "p99_ms": round(percentile(values, 99), 2),
+            "max_ms": round(values[-1], 2) if values else 0.0,
+        }
+
+    total = sum(len(values) for values in latencies.values())
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "total_requests": total,
+        "throughput_rps": round(total / elapsed, 1),
+        "routes": report,
+    }
+
+
+async def wait_until_ready(
+    base_url: str, server: multiprocessing.Process, timeout: float = 120.0
+):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while True:
+            if not server.is_alive():
+                raise RuntimeError(f"API server exited with code {server.exitcode}")
+            try:
+                async with session.get(f"{base_url}/") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("API did not start")
+            await asyncio.sleep(0.2)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def main(args) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    server = multiprocessing.Process(target=serve, args=(args, port), daemon=True)
+    server.start()
+    try:
+        await wait_until_ready(base_url, server)
+        results = await generate_load(base_url, args)
+    finally:
+        server.terminate()
+        server.join()
+
+    config = {key: value for key, value in vars(args).items() if key != "output"}
+    return {"config": config, **results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    backend = parser.add_mutually_exclusive_group(required=True)
+    backend.add_argument("--in-memory", action="store_true")
+    backend.add_argument("--mongo-url")
+    parser.add_argument("--books", type=int, default=10_000)
+    parser.add_argument("--changes", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds")
+    parser.add_argument(
+        "--mix",
+        default="list_books=5,get_book=3,list_changes=2",
+        help="Relative weights of list_books, get_book and list_changes",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(main(args)), indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
@@ -0,0 +1,104 @@
+"""
+Compare the memory and encoding cost of books held as dicts and as BookRecords
+
+Usage:
+    uv run python -m benchmarks.book_memory --books 1000000
+
+Builds the same synthetic catalog twice, as the nested dicts the crawler
+used to pass around and as `BookRecord`s, and reports the bytes allocated
+per book (measured with tracemalloc) and the time taken to turn every book
+into the document that is written to MongoDB.
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from src.database.models import BookRecord
+
+
+def book_details(i: int) -> dict:
+    """A book as parsed from its detail page"""
+    price = f"£{10 + (i * 7919 % 5000) / 100:.2f}"
+    return {
+        "title": f"Book {i}",
+        "url": f"https://books.toscrape.com/catalogue/book-{i}_{i}/index.html",
+        "cover": f"https://books.toscrape.com/media/cache/{i:032x}.jpg",
+        "category": f"Category {i % 50}",
+        "ratings": i % 5 + 1,
+        "description": f"Synthetic description for book {i}. " * 8,
+        "information": {
+            "UPC": f"{i:016x}",
+            "Product Type": "Books",
+            "Price (excl. tax)": price,
+            "Price (incl. tax)": price,
+            "Tax": "£0.00",
+            "Availability": f"In stock ({i % 23} available)",
+            "Number of reviews": str(i % 7),
+        },
+    }
+
+
+def dict_document(book: dict) -> dict:
+    """What saving a dict book used to do: copy it and parse the price"""
+    document = dict(book)
+    try:
+        price = book["information"]["Price (excl. tax)"]
+        document["price"] = float(price.replace("£", "").replace(",", ""))
+    except (KeyError, ValueError):
+        document["price"] = 0.0
+    document["upc"] = book["information"].get("UPC")
+    return document
+
+
+def measure(build, encode, books: int) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    items = [build(i) for i in range(books)]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for item in items:
+        encode(item)
+    encode_seconds = time.perf_counter() - start
+
+    del items
+    gc.collect()
+    return {
+        "total_mb": round(allocated / 1024 / 1024, 1),
+        "bytes_per_book": round(allocated / books),
+        "encode_seconds": round(encode_seconds, 3),
+        "encodes_per_second": round(books / encode_seconds),
+    }
+
+
+def run(args) -> dict:
+    dicts = measure(book_details, dict_document, args.books)
+    records = measure(
+        lambda i: BookRecord.from_details(book_details(i)),
+        BookRecord.to_document,
+        args.books,
+    )
+
+    return {
+        "books": args.books,
+        "dict": dicts,
+        "record": records,
+        "memory_saved": round(1 - records["total_mb"] / dicts["total_mb"], 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=200_000)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
@@ -0,0 +1,148 @@
+"""
+Measure crawler throughput against a local synthetic books site
+
+Usage:
+    uv run python -m benchmarks.crawler_throughput --books 10000 --latency-ms 20
+
+The site is served from a separate process so its CPU time does not count
+against the crawler. Books are discarded by default; pass --sink mongo to
+write them to the MongoDB at MONGO_URL (in the MONGO_DB_NAME database, which
+defaults to "bookscrapper_bench" here so real data is never touched).
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import socket
+import time
+
+import aiohttp
+
+from benchmarks.synthetic_site import SiteConfig, serve
+from src.database.models import BookRecord
+
+
+def noop_sink(books: list[BookRecord]) -> dict:
+    return {"inserted": len(books), "updated": 0, "errors": 0, "total": len(books)}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(url: str, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while True:
+            try:
+                async with session.get(f"{url}__stats") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Synthetic site at {url} did not start")
+            await asyncio.sleep(0.1)
+
+
+async def server_stats(url: str) -> dict:
+    async with (
+        aiohttp.ClientSession() as session,
+        session.get(f"{url}__stats") as response,
+    ):
+        return await response.json()
+
+
+async def run(args) -> dict:
+    from src.crawler.crawler import scrape_website
+
+    port = free_port()
+    root_url = f"http://127.0.0.1:{port}/"
+    config = SiteConfig(
+        books=args.books,
+        categories=args.categories,
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        compress=args.compress,
+    )
+
+    server = multiprocessing.Process(
+        target=serve, args=(config,), kwargs={"port": port}, daemon=True
+    )
+    server.start()
+
+    try:
+        await wait_until_ready(root_url)
+        before = await server_stats(root_url)
+
+        save_func = noop_sink
+        if args.sink == "mongo":
+            os.environ.setdefault("MONGO_DB_NAME", "bookscrapper_bench")
+            from src.database.db import init_db, save_books_batch
+
+            init_db()
+            save_func = save_books_batch
+
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        result = await scrape_website(
+            root_url=root_url,
+            save_func=save_func,
+            concurrency=args.concurrency,
+            fetch_covers=args.covers,
+            mode=args.mode,
+        )
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+
+        after = await server_stats(root_url)
+    finally:
+        server.terminate()
+        server.join()
+
+    pages = after["requests"] - before["requests"]
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    return {
+        "config": vars(args),
+        "books": result["total_books"],
+        "pages": pages,
+        "server_errors": after["errors"] - before["errors"],
+        "wall_seconds": round(wall, 3),
+        "pages_per_second": round(pages / wall, 1),
+        "books_per_second": round(result["total_books"] / wall, 1),
+        "cpu_seconds": round(cpu, 3),
+        "cpu_utilization": round(cpu / wall, 3),
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        "crawl": result,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=1000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--compress", action="store_true", help="Serve compressed HTML responses"
+    )
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--mode", choices=["auto", "category", "sweep"], default="auto")
+    parser.add_argument("--sink", choices=["noop", "mongo"], default="noop")
+    parser.add_argument(
+        "--covers", action="store_true", help="Also download covers to COVERS_DIR"
+    )
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
@@ -0,0 +1,86 @@
+"""
+Measure the per-request overhead added by the rate limiter
+
+Usage:
+    uv run python -m benchmarks.rate_limit [--redis-url redis://localhost:6379/15]
+
+Without --redis-url only the in-process bucket is measured.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from src.api.rate_limit import RateLimiter
+
+
+async def measure(limiter: RateLimiter, rate: str, requests: int, keys: int) -> dict:
+    latencies = []
+    for i in range(requests):
+        start = time.perf_counter()
+        await limiter.hit(f"key-{i % keys}", rate)
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "mean_us": round(statistics.fmean(latencies), 2),
+        "p50_us": round(latencies[len(latencies) // 2], 2),
+        "p99_us": round(latencies[int(len(latencies) * 0.99)], 2),
+    }
+
+
+async def measure_concurrent(
+    limiter: RateLimiter, rate: str, requests: int, concurrency: int
+) -> dict:
+    async def worker(worker_id: int):
+        for i in range(requests // concurrency):
+            await limiter.hit(f"key-{worker_id}-{i % 10}", rate)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "hits_per_second": round(requests / elapsed),
+    }
+
+
+async def main(args):
+    backends = {"memory": None}
+    if args.redis_url:
+        backends["redis"] = args.redis_url
+
+    report = {}
+    for name, redis_url in backends.items():
+        # Generous limit: measures the cost of an allowed request
+        allowed = await measure(
+            RateLimiter(redis_url), "1000000/hour", args.requests, args.keys
+        )
+        # Every key exhausted after one hit: measures the local rejection path
+        rejected = await measure(
+            RateLimiter(redis_url), "1/hour", args.requests, args.keys
+        )
+        concurrent = await measure_concurrent(
+            RateLimiter(redis_url), "1000000/hour", args.requests, args.concurrency
+        )
+        report[name] = {
+            "allowed": allowed,
+            "rejected": rejected,
+            "concurrent": concurrent,
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--redis-url", default=None)
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--keys", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,347 @@
+"""
+Synthetic books.toscrape.com clone for offline crawler benchmarks
+
+Pages are rendered on demand from the book index, so catalogs of a million
+books cost no disk space or start-up time. The markup mirrors the parts of
+the real site the crawler relies on: the category sidebar, `product_pod`
+listings with "Page K of N" pagers and `li.next` links, the global
+`catalogue/page-K.html` listing, and detail pages with breadcrumb, rating,
+description and product information table.
+
+Run standalone with:
+    uv run python -m benchmarks.synthetic_site --books 10000 --port 8080
+"""
+
+import argparse
+import asyncio
+import functools
+import hashlib
+import io
+import random
+from dataclasses import dataclass
+from html import escape
+
+from aiohttp import web
+
+BOOKS_PER_PAGE = 20
+RATINGS = ["One", "Two", "Three", "Four", "Five"]
+# Distinct cover images; books share them so content-addressed storage dedupes
+COVER_VARIANTS = 16
+
+
+@functools.cache
+def cover_image(variant: int) -> bytes:
+    """A small solid-colour JPEG, or placeholder bytes when Pillow is missing"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return f"cover-{variant}".encode() * 64
+
+    buffer = io.BytesIO()
+    colour = (variant * 15 % 256, variant * 45 % 256, variant * 85 % 256)
+    Image.new("RGB", (120, 180), colour).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+@dataclass
+class SiteConfig:
+    books: int = 1000
+    categories: int = 50
+    # Mean added latency per response, with +/-50% uniform jitter
+    latency_ms: float = 0.0
+    # Fraction of responses answered with a 503
+    error_rate: float = 0.0
+    # Compress HTML responses for clients that accept gzip or deflate
+    compress: bool = False
+    seed: int = 0
+
+
+class SyntheticSite:
+    """
+    Deterministic catalog: book `i` belongs to category `i % categories`, so
+    categories hold books `c, c + categories, c + 2 * categories, ...`
+    """
+
+    def __init__(self, config: SiteConfig):
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.requests = 0
+        self.errors = 0
+
+    # Catalog
+
+    def category_slug(self, category: int) -> str:
+        return f"category-{category}_{category + 2}"
+
+    def category_name(self, category: int) -> str:
+        return f"Category {category}"
+
+    def category_size(self, category: int) -> int:
+        books, categories = self.config.books, self.config.categories
+        return books // categories + (1 if category < books % categories else 0)
+
+    def category_books(self, category: int, page: int) -> list[int]:
+        start = (page - 1) * BOOKS_PER_PAGE
+        end = min(start + BOOKS_PER_PAGE, self.category_size(category))
+        return [category + i * self.config.categories for i in range(start, end)]
+
+    def book_slug(self, book: int) -> str:
+        return f"book-{book}_{book + 1}"
+
+    def book_upc(self, book: int) -> str:
+        return hashlib.md5(f"book-{book}".encode()).hexdigest()[:16]
+
+    def book_price(self, book: int) -> float:
+        return 10 + (book * 7919 % 5000) / 100
+
+    @staticmethod
+    def page_count(items: int) -> int:
+        return max(1, -(-items // BOOKS_PER_PAGE))
+
+    # Markup
+
+    def _pager(self, page: int, pages: int, next_href: str) -> str:
+        next_link = ""
+        if page < pages:
+            next_link = f'<li class="next"><a href="{next_href}">next</a></li>'
+        return (
+            '<ul class="pager">'
+            f'<li class="current">\n    Page {page} of {pages}\n</li>'
+            f"{next_link}</ul>"
+        )
+
+    def _product_pods(self, books: list[int], href_prefix: str) -> str:
+        pods = []
+        for book in books:
+            href = f"{href_prefix}{self.book_slug(book)}/index.html"
+            pods.append(
+                '<li><article class="product_pod">'
+                f'<p class="star-rating {RATINGS[book % 5]}"></p>'
+                f'<h3><a href="{href}" title="Book {book}">Book {book}</a></h3>'
+                f'<p class="price_color">£{self.book_price(book):.2f}</p>'
+                "</article></li>"
+            )
+        return "<ol class='row'>" + "".join(pods) + "</ol>"
+
+    def _sidebar(self, prefix: str) -> str:
+        links = [
+            f'<li><a href="{prefix}catalogue/category/books_1/index.html">Books</a><ul>'
+        ]
+        for category in range(self.config.categories):
+            links.append(
+                f'<li><a href="{prefix}catalogue/category/books/'
+                f'{self.category_slug(category)}/index.html">'
+                f"{self.category_name(category)}</a></li>"
+            )
+        links.append("</ul></li>")
+        return '<div class="side_categories"><ul>' + "".join(links) + "</ul></div>"
+
+    def _document(self, body: str) -> str:
+        return f"<!DOCTYPE html><html><head></head><body>{body}</body></html>"
+
+    def render_catalogue_page(self, page: int, from_index: bool) -> str:
+        pages = self.page_count(self.config.books)
+        start = (page - 1) * BOOKS_PER_PAGE
+        books = list(range(start, min(start + BOOKS_PER_PAGE, self.config.books)))
+
+        prefix = "" if from_index else "../"
+        href_prefix = "catalogue/" if from_index else ""
+        next_href = f"{href_prefix}page-{page + 1}.html"
+
+        return self._document(
+            self._sidebar(prefix)
+            + f"<form><strong>{self.config.books}</strong> results</form>"
+            + self._product_pods(books, href_prefix)
+            + self._pager(page, pages, next_href)
+        )
+
+    def render_category_page(self, category: int, page: int) -> str:
+        pages = self.page_count(self.category_size(category))
+        books = self.category_books(category, page)
+
+        return self._document(
+            self._sidebar("../../../../")
+            + f"<h1>{self.category_name(category)}</h1>"
+            + f"<form><strong>{self.category_size(category)}</strong> results</form>"
+            + self._product_pods(books, "../../../")
+            + self._pager(page, pages, f"page-{page + 1}.html")
+        )
+
+    def render_book_page(self, book: int) -> str:
+        category = book % self.config.categories
+        price = f"Â£{self.book_price(book):.2f}"
+        image = hashlib.md5(f"cover-{book}".encode()).hexdigest()
+        description = escape(f"Synthetic description for book {book}. " * 8)
+        stock = book % 23
+
+        rows = [
+            ("UPC", self.book_upc(book)),
+            ("Product Type", "Books"),
+            ("Price (excl. tax)", price),
+            ("Price (incl. tax)", price),
+            ("Tax", "Â£0.00"),
+            ("Availability", f"In stock ({stock} available)"),
+            ("Number of reviews", str(book % 7)),
+        ]
+        table = "".join(
+            f"<tr><th>{key}</th><td>{value}</td></tr>" for key, value in rows
+        )
+
+        return (
+            "<!DOCTYPE html><html><head>"
+            f'<meta name="description" content="{description}" />'
+            "</head><body>"
+            '<ul class="breadcrumb">'
+            '<li><a href="../../index.html">Home</a></li>'
+            '<li><a href="../category/books_1/index.html">Books</a></li>'
+            f'<li><a href="../category/books/{self.category_slug(category)}'
+            '/index.html">'
+            f"{self.category_name(category)}</a></li>"
+            f'<li class="active">Book {book}</li></ul>'
+            '<div class="item active">'
+            f'<img src="../../media/cache/{image[:2]}/{image[2:4]}/{image}.jpg" '
+            f'alt="Book {book}" /></div>'
+            f"<h1>Book {book}</h1>"
+            f'<p class="star-rating {RATINGS[book % 5]}"></p>'
+            f"<table>{table}</table>"
+            "</body></html>"
+        )
+
+    # HTTP
+
+    async def _respond(self, render, *args) -> web.Response:
+        self.requests += 1
+
+        if self.config.latency_ms:
+            jitter = self.random.uniform(0.5, 1.5)
+            await asyncio.sleep(self.config.latency_ms * jitter / 1000)
+
+        if self.config.error_rate and self.random.random() < self.config.error_rate:
+            self.errors += 1
+            return web.Response(status=503, text="Service Unavailable")
+
+        try:
+            html = render(*args)
+        except (IndexError, ValueError):
+            raise web.HTTPNotFound()
+
+        response = web.Response(text=html, content_type="text/html")
+        if self.config.compress:
+            response.enable_compression()
+        return response
+
+    def _check_page(self, page: int, items: int) -> int:
+        if not 1 <= page <= self.page_count(items):
+            raise ValueError(page)
+        return page
+
+    async def index(self, request: web.Request) -> web.Response:
+        return await self._respond(self.render_catalogue_page, 1, True)
+
+    async def catalogue_page(self, request: web.Request) -> web.Response:
+        page = int(request.match_info["page"])
+
+        def render():
+            self._check_page(page, self.config.books)
+            return self.render_catalogue_page(page, False)
+
+        return await self._respond(render)
+
+    async def category_page(self, request: web.Request) -> web.Response:
+        category = int(request.match_info["slug"].split("_")[-1]) - 2
+        page = int(request.match_info.get("page", 1))
+
+        def render():
+            if not 0 <= category < self.config.categories:
+                raise ValueError(category)
+            self._check_page(page, self.category_size(category))
+            return self.render_category_page(category, page)
+
+        return await self._respond(render)
+
+    async def book_page(self, request: web.Request) -> web.Response:
+        book = int(request.match_info["slug"].split("_")[-1]) - 1
+
+        def render():
+            if not 0 <= book < self.config.books:
+                raise ValueError(book)
+            return self.render_book_page(book)
+
+        return await self._respond(render)
+
+    async def cover(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+
+        def render():
+            variant = int(name, 16) % COVER_VARIANTS
+            etag = f'"cover-{variant}"'
+            if request.headers.get("If-None-Match") == etag:
+                return web.Response(status=304, headers={"ETag": etag})
+            return web.Response(
+                body=cover_image(variant),
+                content_type="image/jpeg",
+                headers={"ETag": etag},
+            )
+
+        self.requests += 1
+        if self.config.latency_ms:
+            await asyncio.sleep(
+                self.config.latency_ms * self.random.uniform(0.5, 1.5) / 1000
+            )
+        try:
+            return render()
+        except ValueError:
+            raise web.HTTPNotFound()
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"requests": self.requests, "errors": self.errors})
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/", self.index)
+        app.router.add_get("/index.html", self.index)
+        app.router.add_get("/__stats", self.stats)
+        app.router.add_get(r"/catalogue/page-{page:\d+}.html", self.catalogue_page)
+        app.router.add_get(
+            "/catalogue/category/books/{slug}/index.html", self.category_page
+        )
+        app.router.add_get(
+            r"/catalogue/category/books/{slug}/page-{page:\d+}.html",
+            self.category_page,
+        )
+        app.router.add_get("/catalogue/{slug}/index.html", self.book_page)
+        app.router.add_get(r"/media/cache/{a}/{b}/{name:[0-9a-f]+}.jpg", self.cover)
+        return app
+
+
+def serve(config: SiteConfig, host: str = "127.0.0.1", port: int = 8080):
+    """Serve the synthetic site until the process is terminated"""
+    web.run_app(
+        SyntheticSite(config).make_app(),
+        host=host,
+        port=port,
+        access_log=None,
+        print=None,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=1000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--compress", action="store_true")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    serve(
+        SiteConfig(
+            books=args.books,
+            categories=args.categories,
+            latency_ms=args.latency_ms,
+            error_rate=args.error_rate,
+            compress=args.compress,
+        ),
+        port=args.port,
+    )
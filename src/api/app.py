@@ -1,10 +1,27 @@
-from fastapi import FastAPI, Request
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Request, Response
+
+from src.api.auth import verify_metrics_token
+from src.api.rate_limit import add_rate_limit_headers, limiter
+from src.api.routes import books, changes, covers
+from src.api.services.change_feed import broadcaster
+from src.api.services.refresh_service import refresher
+from src.database.db import lifespan as db_lifespan
+from src.utils.metrics import REQUEST_SECONDS, render_metrics
+from src.utils.profiling import profile_requests
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with db_lifespan(app):
+        try:
+            yield
+        finally:
+            await broadcaster.close()
+            await refresher.close()
 
-from src.api.rate_limit import limiter
-from src.api.routes import books, changes
-from src.database.db import lifespan
 
 app = FastAPI(
     title="Book Scraper API",
@@ -13,13 +30,30 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# Include rate limiter
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.middleware("http")(profile_requests)
+app.middleware("http")(add_rate_limit_headers)
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by endpoint name rather than raw path to bound cardinality
+        route = request.scope.get("route")
+        REQUEST_SECONDS.labels(
+            request.method, route.name if route else "unmatched", status
+        ).observe(time.perf_counter() - start)
+
 
 # Include routers
 app.include_router(books.router, prefix="/books", tags=["Books"])
 app.include_router(changes.router, prefix="/changes", tags=["Changes"])
+app.include_router(covers.router, prefix="/covers", tags=["Covers"])
 
 
 @app.get("/")
@@ -27,11 +61,24 @@ async def root():
     return {
         "message": "Book Scraper API",
         "version": "1.0.0",
-        "endpoints": {"books": "/books", "changes": "/changes", "docs": "/docs"},
+        "endpoints": {
+            "books": "/books",
+            "changes": "/changes",
+            "covers": "/covers",
+            "docs": "/docs",
+            "metrics": "/metrics",
+        },
     }
 
 
-@app.get("/health")
-@limiter.limit("100/hour")
+@app.get("/health", dependencies=[Depends(limiter.limit_by_address("100/hour"))])
 async def health_check(request: Request):
     return {"status": "healthy"}
+
+
+@app.get(
+    "/metrics", include_in_schema=False, dependencies=[Depends(verify_metrics_token)]
+)
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
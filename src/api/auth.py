@@ -1,4 +1,6 @@
 import os
+import secrets
+from typing import Optional
 
 from dotenv import load_dotenv
 from fastapi import HTTPException, Security, status
@@ -13,6 +15,11 @@ api_key_header = APIKeyHeader(name=API_KEY_NAME, auto_error=False)
 # Format: API_KEYS=key1,key2,key3
 API_KEYS = set(os.getenv("API_KEYS", "").split(","))
 
+# Bearer token Prometheus must send to scrape /metrics, which is public when
+# it is not set
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+authorization_header = APIKeyHeader(name="Authorization", auto_error=False)
+
 
 async def get_api_key(api_key: str = Security(api_key_header)):
     """
@@ -31,3 +38,22 @@ async def get_api_key(api_key: str = Security(api_key_header)):
         )
 
     return api_key
+
+
+async def verify_metrics_token(
+    authorization: Optional[str] = Security(authorization_header),
+):
+    """
+    Validate the bearer token of a metrics scrape when METRICS_TOKEN is set
+    """
+    if not METRICS_TOKEN:
+        return
+
+    if authorization is None or not secrets.compare_digest(
+        authorization.encode(), f"Bearer {METRICS_TOKEN}".encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
@@ -1,5 +1,226 @@
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.util import get_remote_address
+import hashlib
+import math
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
 
-limiter = Limiter(key_func=get_remote_address)
+from dotenv import load_dotenv
+from fastapi import Depends, HTTPException, Request, status
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.api.auth import get_api_key
+
+load_dotenv()
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# Seconds between sweeps of the per-process buckets and blocks that expired
+LOCAL_SWEEP_INTERVAL = 60
+# Upper bound on per-process buckets; the least recently used are evicted
+MAX_LOCAL_BUCKETS = 100_000
+
+# Refills the bucket from the time elapsed since the last hit and takes one
+# token, all in one atomic round trip. Uses the Redis clock so every API
+# worker and pod agrees on time.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_per_ms = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill_per_ms)
+
+local allowed = 0
+local retry_after_ms = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after_ms = math.ceil((1 - tokens) / refill_per_ms)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / refill_per_ms))
+return {allowed, math.floor(tokens), retry_after_ms}
+"""
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float = 0.0
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """Parse a rate such as "100/hour" into (requests, period in seconds)"""
+    try:
+        amount, period = rate.split("/")
+        return int(amount), PERIODS[period.strip()]
+    except (ValueError, KeyError) as e:
+        raise ValueError(f"Invalid rate limit: {rate}") from e
+
+
+class RateLimiter:
+    """
+    Token bucket rate limiter shared by every API worker through Redis
+
+    Falls back to a per-process bucket when REDIS_URL is not configured.
+    Once a key has been rejected, further requests from it are rejected
+    locally until its retry-after time has passed, so clients hammering
+    the API while limited cost no Redis round trips.
+
+    Per-process buckets are dropped once they have refilled, since a full
+    bucket is the same as none, and blocks once they have expired. At most
+    MAX_LOCAL_BUCKETS buckets are kept.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, enabled: bool = True):
+        self.enabled = enabled
+        self._redis = Redis.from_url(redis_url) if redis_url else None
+        self._script = (
+            self._redis.register_script(TOKEN_BUCKET_SCRIPT) if self._redis else None
+        )
+        self._blocked_until: dict[str, float] = {}
+        # key -> (tokens, last hit, time the bucket is full again), least
+        # recently used first
+        self._local_buckets: dict[str, tuple[float, float, float]] = {}
+        self._next_sweep = time.monotonic() + LOCAL_SWEEP_INTERVAL
+
+    async def hit(self, identity: str, rate: str) -> RateLimitResult:
+        """Consume one request for `identity` under `rate`"""
+        capacity, period = parse_rate(rate)
+        key = f"ratelimit:{rate}:{hashlib.sha256(identity.encode()).hexdigest()[:32]}"
+
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        blocked_until = self._blocked_until.get(key)
+        if blocked_until is not None:
+            if now < blocked_until:
+                return RateLimitResult(False, capacity, 0, blocked_until - now)
+            del self._blocked_until[key]
+
+        if self._script is not None:
+            try:
+                allowed, remaining, retry_after_ms = await self._script(
+                    keys=[key], args=[capacity, capacity / (period * 1000)]
+                )
+                result = RateLimitResult(
+                    bool(allowed), capacity, int(remaining), retry_after_ms / 1000
+                )
+            except RedisError as e:
+                # Fail open: an unavailable limiter must not take the API down
+                print(f"Rate limiter unavailable: {e}")
+                return RateLimitResult(True, capacity, capacity)
+        else:
+            result = self._hit_local(key, capacity, period, now)
+
+        if not result.allowed:
+            self._blocked_until[key] = now + result.retry_after
+
+        return result
+
+    def _hit_local(
+        self, key: str, capacity: int, period: int, now: float
+    ) -> RateLimitResult:
+        tokens, last, _ = self._local_buckets.pop(key, (capacity, now, now))
+        tokens = min(capacity, tokens + (now - last) * capacity / period)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+
+        # Reinserted so the dict stays ordered from least to most recently used
+        full_at = now + (capacity - tokens) * period / capacity
+        self._local_buckets[key] = (tokens, now, full_at)
+        while len(self._local_buckets) > MAX_LOCAL_BUCKETS:
+            del self._local_buckets[next(iter(self._local_buckets))]
+
+        if allowed:
+            return RateLimitResult(True, capacity, int(tokens))
+        return RateLimitResult(False, capacity, 0, (1 - tokens) * period / capacity)
+
+    def _sweep(self, now: float):
+        self._local_buckets = {
+            key: bucket
+            for key, bucket in self._local_buckets.items()
+            if bucket[2] > now
+        }
+        self._blocked_until = {
+            key: until for key, until in self._blocked_until.items() if until > now
+        }
+        self._next_sweep = now + LOCAL_SWEEP_INTERVAL
+
+    async def check(self, identity: str, rate: str, request: Request):
+        if not self.enabled:
+            return
+
+        result = await self.hit(identity, rate)
+
+        if not result.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Rate limit exceeded: {rate}",
+                headers={
+                    "Retry-After": str(math.ceil(result.retry_after)),
+                    "X-RateLimit-Limit": str(result.limit),
+                    "X-RateLimit-Remaining": "0",
+                },
+            )
+
+        # Added to the response by `add_rate_limit_headers`, which also
+        # covers routes returning their own (e.g. streaming) response
+        request.state.rate_limit_headers = {
+            "X-RateLimit-Limit": str(result.limit),
+            "X-RateLimit-Remaining": str(result.remaining),
+        }
+
+    def limit(self, rate: str):
+        """
+        Dependency enforcing `rate` per API key
+
+        Validates the API key through `get_api_key` and returns it, so it
+        replaces `Depends(get_api_key)` on rate-limited routes.
+        """
+        parse_rate(rate)
+
+        async def dependency(
+            request: Request, api_key: str = Depends(get_api_key)
+        ) -> str:
+            await self.check(api_key, rate, request)
+            return api_key
+
+        return dependency
+
+    def limit_by_address(self, rate: str):
+        """Dependency enforcing `rate` per client address, for public routes"""
+        parse_rate(rate)
+
+        async def dependency(request: Request):
+            address = request.client.host if request.client else "unknown"
+            await self.check(address, rate, request)
+
+        return dependency
+
+
+limiter = RateLimiter(
+    redis_url=os.getenv("REDIS_URL"),
+    enabled=os.getenv("RATE_LIMIT_ENABLED", "true").lower() != "false",
+)
+
+
+async def add_rate_limit_headers(request: Request, call_next):
+    """Middleware adding the X-RateLimit-* headers recorded by `check`"""
+    response = await call_next(request)
+    headers = getattr(request.state, "rate_limit_headers", None)
+    if headers:
+        response.headers.update(headers)
+    return response
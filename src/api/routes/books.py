@@ -1,17 +1,37 @@
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
+from fastapi.responses import StreamingResponse
 
-from api.auth import get_api_key
 from src.api.rate_limit import limiter
+from src.api.services.export_service import (
+    BOOK_COLUMNS,
+    EXPORT_FORMATS,
+    export_projection,
+    parquet_available,
+    stream_export,
+)
+from src.api.services.refresh_service import (
+    BookNotFound,
+    MissingSourceUrl,
+    RefreshUnavailable,
+    refresher,
+)
 from src.crawler.crawler import run_scraper
-from src.database.db import get_book_by_id, get_book_count, get_books
+from src.database.db import (
+    get_book_by_id,
+    get_book_by_upc,
+    get_book_count,
+    get_books,
+    get_books_by_ids,
+    iter_books,
+)
+from src.database.models import BookBatchRequest
 
 router = APIRouter()
 
 
 @router.get("/")
-@limiter.limit("100/hour")
 async def list_books(
     request: Request,
     category: Optional[str] = Query(None, description="Filter by category"),
@@ -23,7 +43,7 @@ async def list_books(
     ),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
-    api_key: str = Depends(get_api_key),
+    api_key: str = Depends(limiter.limit("100/hour")),
 ):
     """
     Get books with filtering, sorting, and pagination
@@ -49,12 +69,83 @@ async def list_books(
     return result
 
 
+@router.get("/export")
+async def export_books(
+    request: Request,
+    export_format: str = Query(
+        "ndjson",
+        alias="format",
+        regex="^(ndjson|csv|parquet)$",
+        description="Export format",
+    ),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    min_price: Optional[float] = Query(None, ge=0, description="Minimum price"),
+    max_price: Optional[float] = Query(None, ge=0, description="Maximum price"),
+    rating: Optional[int] = Query(None, ge=1, le=5, description="Filter by rating"),
+    sort_by: str = Query(
+        "title", regex="^(rating|price|reviews|title)$", description="Sort by field"
+    ),
+    api_key: str = Depends(limiter.limit("100/hour")),
+):
+    """
+    Stream every matching book in a single response
+
+    - **format**: ndjson, csv or parquet
+    - Accepts the same filters as `GET /books`, without pagination
+    """
+    if export_format == "parquet" and not parquet_available():
+        raise HTTPException(
+            status_code=501, detail="Parquet export requires pyarrow to be installed"
+        )
+
+    books = iter_books(
+        category=category,
+        min_price=min_price,
+        max_price=max_price,
+        rating=rating,
+        sort_by=sort_by,
+        projection=export_projection(BOOK_COLUMNS),
+    )
+
+    return StreamingResponse(
+        stream_export(books, export_format, BOOK_COLUMNS),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="books.{export_format}"'
+        },
+    )
+
+
+@router.post("/batch")
+async def get_books_batch(
+    request: Request,
+    batch: BookBatchRequest,
+    api_key: str = Depends(limiter.limit("100/hour")),
+):
+    """
+    Get many books in one request
+
+    - **ids**: Up to 500 MongoDB ObjectIds and/or UPCs
+    - **fields**: Optional list of fields to return for each book
+
+    Every requested id gets an entry in `results` with a status of
+    `found`, `not_found` or `invalid`.
+    """
+    projection = None
+    if batch.fields:
+        projection = {field: 1 for field in batch.fields}
+
+    results = get_books_by_ids(batch.ids, projection=projection)
+    found = sum(1 for result in results if result["status"] == "found")
+
+    return {"requested": len(results), "found": found, "results": results}
+
+
 @router.get("/{book_id}")
-@limiter.limit("100/hour")
 async def get_book(
     request: Request,
     book_id: str = Path(..., description="MongoDB ObjectId of the book"),
-    api_key: str = Depends(get_api_key),
+    api_key: str = Depends(limiter.limit("100/hour")),
 ):
     """
     Get full details about a specific book by ID
@@ -67,17 +158,59 @@ async def get_book(
     return book
 
 
+@router.post("/{book_id}/refresh")
+async def refresh_book(
+    request: Request,
+    book_id: str = Path(..., description="MongoDB ObjectId of the book"),
+    api_key: str = Depends(limiter.limit("100/hour")),
+):
+    """
+    Re-fetch a book from the source site and save it
+
+    Price changes are tracked like in a full scrape. Concurrent refreshes of
+    the same book share one upstream fetch, and a book refreshed in the last
+    `REFRESH_TTL_SECONDS` is returned as is (`cached: true`).
+    """
+    try:
+        return await refresher.refresh(book_id)
+    except BookNotFound:
+        raise HTTPException(status_code=404, detail="Book not found")
+    except MissingSourceUrl as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except RefreshUnavailable as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+
+@router.get("/upc/{upc}")
+async def get_book_upc(
+    request: Request,
+    upc: str = Path(..., description="Universal Product Code of the book"),
+    api_key: str = Depends(limiter.limit("100/hour")),
+):
+    """
+    Get full details about a specific book by UPC
+    """
+    book = get_book_by_upc(upc)
+
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+
+    return book
+
+
 @router.get("/stats/count")
-@limiter.limit("100/hour")
-async def count_books(request: Request, api_key: str = Depends(get_api_key)):
+async def count_books(
+    request: Request, api_key: str = Depends(limiter.limit("100/hour"))
+):
     """Get total count of books in database"""
     count = get_book_count()
     return {"count": count}
 
 
 @router.post("/scrape")
-@limiter.limit("100/hour")
-async def trigger_scrape(request: Request, api_key: str = Depends(get_api_key)):
+async def trigger_scrape(
+    request: Request, api_key: str = Depends(limiter.limit("100/hour"))
+):
     """
     Trigger a full scraping job
 
@@ -1,30 +1,148 @@
+from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
-from api.auth import get_api_key
-from api.rate_limit import limiter
-from src.database.db import get_recent_changes
+from src.api.rate_limit import limiter
+from src.api.services.change_feed import stream_changes
+from src.api.services.export_service import (
+    CHANGE_COLUMNS,
+    EXPORT_FORMATS,
+    parquet_available,
+    stream_export,
+)
+from src.database.db import (
+    decode_change_cursor,
+    encode_change_cursor,
+    get_changes_since,
+    get_recent_changes,
+    iter_changes,
+    timestamp_cursor,
+)
 
 router = APIRouter()
 
 
 @router.get("/")
-@limiter.limit("100/hour")
 async def list_changes(
     request: Request,
     limit: int = Query(50, ge=1, le=200, description="Number of changes to return"),
     change_type: Optional[str] = Query(
         None, regex="^(new_book|price_change)$", description="Filter by change type"
     ),
-    api_key: str = Depends(get_api_key),
+    since: Optional[str] = Query(
+        None, description="Only return changes after this cursor (oldest first)"
+    ),
+    api_key: str = Depends(limiter.limit("100/hour")),
 ):
     """
     Get recent changes (new books added, price changes, etc.)
 
     - **limit**: Maximum number of changes to return
     - **change_type**: Filter by 'new_book' or 'price_change'
+    - **since**: Cursor from a previous response's `next_cursor`; only changes
+      recorded after it are returned, in chronological order
     """
+    if since is not None:
+        try:
+            result = get_changes_since(since, limit=limit, change_type=change_type)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        return {
+            "count": len(result["changes"]),
+            "changes": result["changes"],
+            "next_cursor": result["next_cursor"],
+        }
+
     changes = get_recent_changes(limit=limit, change_type=change_type)
+    next_cursor = encode_change_cursor(changes[0]) if changes else None
+
+    return {"count": len(changes), "changes": changes, "next_cursor": next_cursor}
+
+
+@router.get("/stream")
+async def stream_change_events(
+    request: Request,
+    change_type: Optional[str] = Query(
+        None, regex="^(new_book|price_change)$", description="Filter by change type"
+    ),
+    since: Optional[str] = Query(
+        None, description="Replay changes after this cursor before streaming"
+    ),
+    last_event_id: Optional[str] = Header(None),
+    api_key: str = Depends(limiter.limit("100/hour")),
+):
+    """
+    Server-sent events stream of new changes as they are logged
+
+    Each event's `id` is a feed cursor, so reconnecting clients resume from
+    where they left off through the standard `Last-Event-ID` header.
+    """
+    since = since or last_event_id
+    if since is not None:
+        try:
+            decode_change_cursor(since)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        stream_changes(since=since, change_type=change_type),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/export")
+async def export_changes(
+    request: Request,
+    export_format: str = Query(
+        "ndjson",
+        alias="format",
+        regex="^(ndjson|csv|parquet)$",
+        description="Export format",
+    ),
+    since: Optional[str] = Query(
+        None,
+        description="Only export changes after this cursor or ISO 8601 timestamp",
+    ),
+    change_type: Optional[str] = Query(
+        None, regex="^(new_book|price_change)$", description="Filter by change type"
+    ),
+    api_key: str = Depends(limiter.limit("100/hour")),
+):
+    """
+    Stream the change log in chronological order
+
+    - **format**: ndjson, csv or parquet
+    - **since**: A `next_cursor` from the feed, or a timestamp; only changes
+      recorded after it are included
+    - **change_type**: Filter by 'new_book' or 'price_change'
+    """
+    if export_format == "parquet" and not parquet_available():
+        raise HTTPException(
+            status_code=501, detail="Parquet export requires pyarrow to be installed"
+        )
+
+    if since is not None:
+        try:
+            decode_change_cursor(since)
+        except ValueError:
+            try:
+                since = timestamp_cursor(datetime.fromisoformat(since))
+            except ValueError:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid cursor or timestamp: {since}",
+                )
+
+    changes = iter_changes(since=since, change_type=change_type)
 
-    return {"count": len(changes), "changes": changes}
+    return StreamingResponse(
+        stream_export(changes, export_format, CHANGE_COLUMNS),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="changes.{export_format}"'
+        },
+    )
@@ -0,0 +1,44 @@
+import re
+
+from fastapi import APIRouter, HTTPException, Path, Query
+from fastapi.responses import FileResponse
+
+from src.crawler.covers import cover_path, image_type
+
+router = APIRouter()
+
+DIGEST_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+# Covers are addressed by content hash, so a given URL never changes
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/{digest}")
+async def get_cover(
+    digest: str = Path(..., description="SHA-256 hash of the cover image"),
+    size: str = Query(
+        "original", regex="^(original|thumbnail)$", description="Image variant"
+    ),
+):
+    """
+    Get a locally stored book cover by its `cover_hash`
+
+    Not rate-limited or authenticated so covers can be used directly in
+    `<img>` tags and cached by browsers and CDNs.
+    """
+    if not DIGEST_PATTERN.fullmatch(digest):
+        raise HTTPException(status_code=404, detail="Cover not found")
+
+    path = cover_path(digest, thumbnail=size == "thumbnail")
+    try:
+        # Originals are stored as downloaded, so their format is sniffed
+        with open(path, "rb") as f:
+            media_type = image_type(f.read(12))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Cover not found")
+
+    return FileResponse(
+        path,
+        media_type=media_type,
+        headers={"Cache-Control": CACHE_CONTROL, "ETag": f'"{digest}-{size}"'},
+    )
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import os
+from typing import AsyncIterator, Optional
+
+from pymongo.errors import PyMongoError
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from starlette.concurrency import run_in_threadpool
+
+from src.database.db import (
+    CHANGES_CHANNEL,
+    decode_change_cursor,
+    get_changes_since,
+    get_latest_change_cursor,
+    serialize_change,
+)
+
+# Seconds between keep-alive comments on idle event streams
+KEEPALIVE_INTERVAL = 15
+# Events buffered per subscriber before it is considered too slow and dropped
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Poll interval for the database fallback used when REDIS_URL is not set
+POLL_INTERVAL = 2.0
+
+
+class ChangeBroadcaster:
+    """
+    Fan change events out to every connected stream subscriber
+
+    A single listener per process reads the Redis channel that `log_change`
+    publishes to (or, without Redis, polls the changes collection) and copies
+    each event into the subscribers' queues, so the number of subscribers
+    does not multiply the load on Redis or MongoDB.
+    """
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_url = redis_url
+        self._subscribers: set[asyncio.Queue] = set()
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+        # Nobody is listening: stop reading Redis or polling MongoDB until the
+        # next subscriber arrives
+        if not self._subscribers and self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    def _publish(self, event: dict):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow consumer: end its stream so it reconnects with Last-Event-ID
+                self._subscribers.discard(queue)
+                queue.get_nowait()
+                queue.put_nowait(None)
+
+    async def _listen(self):
+        if self.redis_url:
+            await self._listen_redis()
+        else:
+            await self._poll_database()
+
+    async def _listen_redis(self):
+        backoff = 1
+        while True:
+            redis_client = Redis.from_url(self.redis_url)
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(CHANGES_CHANNEL)
+                backoff = 1
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._publish(json.loads(message["data"]))
+            except RedisError as e:
+                print(f"Change feed lost Redis connection: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                await pubsub.aclose()
+                await redis_client.aclose()
+
+    async def _poll_database(self):
+        cursor = None
+        while True:
+            try:
+                if cursor is None:
+                    cursor = await run_in_threadpool(get_latest_change_cursor)
+                    cursor = cursor or "0_000000000000000000000000"
+                else:
+                    result = await run_in_threadpool(
+                        get_changes_since, cursor, SUBSCRIBER_QUEUE_SIZE
+                    )
+                    for change in result["changes"]:
+                        self._publish(serialize_change(change))
+                    cursor = result["next_cursor"]
+            except PyMongoError as e:
+                print(f"Error polling changes: {e}")
+
+            await asyncio.sleep(POLL_INTERVAL)
+
+
+broadcaster = ChangeBroadcaster(redis_url=os.getenv("REDIS_URL"))
+
+
+def _format_event(event: dict) -> str:
+    return f"id: {event['cursor']}\nevent: change\ndata: {json.dumps(event)}\n\n"
+
+
+async def stream_changes(
+    since: Optional[str] = None, change_type: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    Yield server-sent events for new changes
+
+    When `since` is given, changes already stored after that cursor are
+    replayed from the database before switching to live events. The
+    subscription is opened first so nothing logged during the replay is lost;
+    live events already covered by the replay are skipped.
+    """
+    queue = broadcaster.subscribe()
+    try:
+        last_key = None
+
+        if since is not None:
+            while True:
+                result = await run_in_threadpool(
+                    get_changes_since, since, SUBSCRIBER_QUEUE_SIZE, change_type
+                )
+                for change in result["changes"]:
+                    yield _format_event(serialize_change(change))
+                since = result["next_cursor"]
+                if len(result["changes"]) < SUBSCRIBER_QUEUE_SIZE:
+                    break
+            last_key = decode_change_cursor(since)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+
+            if event is None:
+                return
+            if change_type and event["change_type"] != change_type:
+                continue
+            if (
+                last_key is not None
+                and decode_change_cursor(event["cursor"]) <= last_key
+            ):
+                continue
+
+            yield _format_event(event)
+    finally:
+        broadcaster.unsubscribe(queue)
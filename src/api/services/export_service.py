@@ -0,0 +1,208 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterable, Iterator
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# (column, type) pairs; nested fields are flattened with a dot separator
+BOOK_COLUMNS = [
+    ("_id", "str"),
+    ("upc", "str"),
+    ("title", "str"),
+    ("category", "str"),
+    ("ratings", "int"),
+    ("price", "float"),
+    ("cover", "str"),
+    ("description", "str"),
+    ("scraped_at", "datetime"),
+    ("information.UPC", "str"),
+    ("information.Product Type", "str"),
+    ("information.Price (excl. tax)", "str"),
+    ("information.Price (incl. tax)", "str"),
+    ("information.Tax", "str"),
+    ("information.Availability", "str"),
+    ("information.Number of reviews", "str"),
+]
+
+CHANGE_COLUMNS = [
+    ("_id", "str"),
+    ("book_id", "str"),
+    ("book_title", "str"),
+    ("category", "str"),
+    ("change_type", "str"),
+    ("old_value", "float"),
+    ("new_value", "float"),
+    ("timestamp", "datetime"),
+]
+
+# Number of documents serialized before a chunk is flushed to the client
+ROWS_PER_CHUNK = 500
+
+
+def flatten(doc: dict, prefix: str = "") -> dict:
+    """Flatten nested dictionaries into dotted keys"""
+    flat = {}
+    for key, value in doc.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+
+def export_projection(columns: list[tuple[str, str]]) -> dict:
+    """
+    Projection fetching every top-level field the columns are read from
+
+    Nested columns are looked up by `flatten` rather than projected by their
+    dotted names, since MongoDB would also split keys like "Price (excl. tax)"
+    on their dots.
+    """
+    return {name.split(".", 1)[0]: 1 for name, _ in columns}
+
+
+def _chunked(docs: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    chunk = []
+    for doc in docs:
+        chunk.append(doc)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def stream_ndjson(docs: Iterable[dict]) -> Iterator[bytes]:
+    """Serialize documents as newline-delimited JSON"""
+    for chunk in _chunked(docs, ROWS_PER_CHUNK):
+        yield "".join(
+            json.dumps(doc, default=_json_default, ensure_ascii=False) + "\n"
+            for doc in chunk
+        ).encode("utf-8")
+
+
+def stream_csv(docs: Iterable[dict], columns: list[tuple[str, str]]) -> Iterator[bytes]:
+    """Serialize documents as CSV with a fixed header"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(
+        buffer, fieldnames=[name for name, _ in columns], extrasaction="ignore"
+    )
+
+    writer.writeheader()
+    for chunk in _chunked(docs, ROWS_PER_CHUNK):
+        writer.writerows(flatten(doc) for doc in chunk)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file object that hands back whatever was written since the
+    last drain, while keeping `tell()` absolute so Parquet footers stay valid
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_parquet(
+    docs: Iterable[dict], columns: list[tuple[str, str]]
+) -> Iterator[bytes]:
+    """Serialize documents as Parquet, writing one row group per chunk"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {
+        "str": pa.string(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "datetime": pa.timestamp("ms"),
+    }
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for chunk in _chunked(docs, ROWS_PER_CHUNK):
+            rows = [_coerce_row(flatten(doc), columns) for doc in chunk]
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+
+    yield sink.drain()
+
+
+def _coerce_row(row: dict, columns: list[tuple[str, str]]) -> dict:
+    coerced = {}
+    for name, kind in columns:
+        value = row.get(name)
+        if value is not None:
+            try:
+                if kind == "str":
+                    value = str(value)
+                elif kind == "int":
+                    value = int(value)
+                elif kind == "float":
+                    value = float(value)
+            except (TypeError, ValueError):
+                value = None
+        coerced[name] = value
+    return coerced
+
+
+def parquet_available() -> bool:
+    """Parquet output depends on the optional `pyarrow` package"""
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def stream_export(
+    docs: Iterable[dict], export_format: str, columns: list[tuple[str, str]]
+) -> Iterator[bytes]:
+    """Serialize an iterable of documents in the requested export format"""
+    if export_format == "ndjson":
+        return stream_ndjson(docs)
+    if export_format == "csv":
+        return stream_csv(docs, columns)
+    if export_format == "parquet":
+        return stream_parquet(docs, columns)
+    raise ValueError(f"Unsupported export format: {export_format}")
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Optional
+
+import aiohttp
+from starlette.concurrency import run_in_threadpool
+
+from src.crawler.crawler import fetch_book_details
+from src.crawler.transport import create_session
+from src.database.db import get_book_by_id, save_book_to_db
+
+# Seconds a refreshed book is served from memory instead of being re-fetched
+REFRESH_TTL_SECONDS = float(os.getenv("REFRESH_TTL_SECONDS", "60"))
+# Upstream requests in flight across all refreshes
+REFRESH_CONCURRENCY = int(os.getenv("REFRESH_CONCURRENCY", "10"))
+
+
+class BookNotFound(Exception):
+    pass
+
+
+class MissingSourceUrl(Exception):
+    pass
+
+
+class RefreshUnavailable(Exception):
+    pass
+
+
+class BookRefresher:
+    """
+    Re-fetch single books from the source site on demand
+
+    Upstream requests go through one pooled session. Concurrent refreshes of
+    the same book share a single in-flight fetch, and the result is reused
+    for `ttl` seconds, so a burst of refresh requests costs one upstream hit.
+    """
+
+    def __init__(
+        self, ttl: float = REFRESH_TTL_SECONDS, concurrency: int = REFRESH_CONCURRENCY
+    ):
+        self.ttl = ttl
+        self.concurrency = concurrency
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self._cache: dict[str, tuple[float, dict]] = {}
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily so it binds to the server's event loop
+        if self._session is None or self._session.closed:
+            self._session = create_session(self.concurrency)
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._session
+
+    async def refresh(self, book_id: str) -> dict:
+        """
+        Refresh a book and return it with the refresh metadata
+
+        Raises:
+            BookNotFound: No book has this id
+            MissingSourceUrl: The book was saved before source URLs were
+                recorded
+            RefreshUnavailable: The source page could not be fetched
+        """
+        cached = self._cache.get(book_id)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            return {**cached[1], "cached": True}
+
+        task = self._in_flight.get(book_id)
+        if task is None:
+            task = asyncio.create_task(self._refresh(book_id))
+            self._in_flight[book_id] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(book_id, None))
+
+        # Shielded so a client disconnecting does not cancel the shared fetch
+        result = await asyncio.shield(task)
+        return {**result, "cached": False}
+
+    async def _refresh(self, book_id: str) -> dict:
+        book = await run_in_threadpool(get_book_by_id, book_id)
+        if book is None:
+            raise BookNotFound(book_id)
+
+        url = book.get("url")
+        if not url:
+            raise MissingSourceUrl(
+                "Book has no source URL yet, it is recorded on the next crawl"
+            )
+
+        session = self._get_session()
+        book_data = await fetch_book_details(session, url, self._semaphore)
+        if book_data is None:
+            raise RefreshUnavailable(f"Could not fetch {url}")
+
+        # Price changes are logged to the change feed like in a crawl
+        await run_in_threadpool(save_book_to_db, book_data)
+        refreshed = await run_in_threadpool(get_book_by_id, book_id, True)
+
+        result = {
+            "book": refreshed,
+            "refreshed_at": datetime.now().isoformat(),
+        }
+        self._store(book_id, result)
+
+        return result
+
+    def _store(self, book_id: str, result: dict):
+        now = time.monotonic()
+        expired = [
+            key
+            for key, (stored_at, _) in self._cache.items()
+            if now - stored_at >= self.ttl
+        ]
+        for key in expired:
+            del self._cache[key]
+        self._cache[book_id] = (now, result)
+
+
+refresher = BookRefresher()
@@ -0,0 +1,228 @@
+"""
+Optional crawl stage that mirrors book covers locally
+
+Covers are stored content-addressed by the SHA-256 of the image, so books
+sharing an image share one file, and re-downloads use the ETag/Last-Modified
+validators from the previous crawl so unchanged covers cost a 304. Thumbnails
+are produced in a process pool (requires Pillow, `uv sync --extra covers`).
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional
+
+import aiohttp
+
+from src.crawler.transport import ResponseTooLarge, read_body
+from src.database.models import BookRecord
+from src.utils.metrics import (
+    BYTES_DOWNLOADED,
+    FETCH_SECONDS,
+    RESPONSES_TOTAL,
+    acquire_slot,
+)
+
+COVERS_DIR = os.getenv("COVERS_DIR", "covers")
+THUMBNAIL_SIZE = int(os.getenv("COVER_THUMBNAIL_SIZE", "150"))
+
+# Leading bytes of the image formats covers are served as
+IMAGE_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+
+class ThumbnailError(Exception):
+    """A cover could not be read or downsized"""
+
+
+def cover_path(digest: str, thumbnail: bool = False) -> str:
+    """Location of a stored cover, fanned out by hash prefix"""
+    variant = f"thumbnails/{THUMBNAIL_SIZE}" if thumbnail else "original"
+    return os.path.join(COVERS_DIR, variant, digest[:2], f"{digest}.jpg")
+
+
+def store_cover(content: bytes) -> str:
+    """Write a cover under its content hash (once) and return the hash"""
+    digest = hashlib.sha256(content).hexdigest()
+    path = cover_path(digest)
+
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    return digest
+
+
+def image_type(header: bytes) -> str:
+    """Media type of an image from its first bytes"""
+    for signature, media_type in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return media_type
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+def make_thumbnail(source: str, destination: str, size: int) -> str:
+    """
+    Downsize a cover to fit in a size x size box (runs in a worker process)
+
+    Thumbnails are always JPEG, whatever the format of the cover.
+
+    Raises:
+        ThumbnailError: The cover is not a readable image or cannot be written
+    """
+    from PIL import Image
+
+    try:
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        with Image.open(source) as image:
+            image.thumbnail((size, size))
+            tmp_path = f"{destination}.{uuid.uuid4().hex}.tmp"
+            image.convert("RGB").save(tmp_path, "JPEG", quality=85, optimize=True)
+        os.replace(tmp_path, destination)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        # Raised as a plain exception type so it pickles back to the crawler
+        raise ThumbnailError(f"{source}: {e}") from None
+
+    return destination
+
+
+def thumbnails_available() -> bool:
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class CoverPipeline:
+    """
+    Downloads covers for scraped books and records where they are stored
+
+    Args:
+        session: HTTP session shared with the crawler
+        semaphore: Crawler semaphore, so cover downloads count against the
+            same concurrency limit as page fetches
+        lookup_previous: Returns the stored cover fields of books by UPC,
+            used to send conditional requests
+        workers: Size of the thumbnail process pool
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore,
+        lookup_previous: Optional[Callable[[List[str]], dict]] = None,
+        workers: int = 2,
+    ):
+        self.session = session
+        self.semaphore = semaphore
+        self.lookup_previous = lookup_previous
+        self.executor = (
+            ProcessPoolExecutor(max_workers=workers) if thumbnails_available() else None
+        )
+        if self.executor is None:
+            print("Pillow is not installed, cover thumbnails are disabled")
+
+        self.downloaded = 0
+        self.not_modified = 0
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    async def process(self, books: List[BookRecord]):
+        """Download and store the covers of a page of books, updating them in place"""
+        previous = {}
+        if self.lookup_previous is not None:
+            previous = self.lookup_previous([book.upc for book in books if book.upc])
+
+        await asyncio.gather(
+            *(self._process_book(book, previous.get(book.upc)) for book in books)
+        )
+
+    async def _process_book(self, book: BookRecord, previous: Optional[dict]):
+        digest = await self._fetch(book, previous)
+        if digest is None:
+            return
+
+        book.cover_hash = digest
+        book.cover_path = cover_path(digest)
+
+        if self.executor is not None:
+            thumbnail = cover_path(digest, thumbnail=True)
+            if not os.path.exists(thumbnail):
+                loop = asyncio.get_running_loop()
+                try:
+                    await loop.run_in_executor(
+                        self.executor,
+                        make_thumbnail,
+                        cover_path(digest),
+                        thumbnail,
+                        THUMBNAIL_SIZE,
+                    )
+                except (ThumbnailError, BrokenProcessPool) as e:
+                    print(f"Error creating thumbnail for {book.cover}: {e}")
+                    return
+            book.thumbnail_path = thumbnail
+
+    async def _fetch(self, book: BookRecord, previous: Optional[dict]) -> Optional[str]:
+        url = book.cover
+        headers = {}
+
+        # Only revalidate when the stored copy is for the same URL and still on disk
+        reusable = (
+            previous is not None
+            and previous.get("cover") == url
+            and previous.get("cover_hash")
+            and os.path.exists(cover_path(previous["cover_hash"]))
+        )
+        if reusable:
+            if previous.get("cover_etag"):
+                headers["If-None-Match"] = previous["cover_etag"]
+            if previous.get("cover_last_modified"):
+                headers["If-Modified-Since"] = previous["cover_last_modified"]
+
+        async with acquire_slot(self.semaphore):
+            start = time.perf_counter()
+            try:
+                async with self.session.get(url, headers=headers) as response:
+                    RESPONSES_TOTAL.labels("cover", response.status).inc()
+
+                    if response.status == 304 and reusable:
+                        self.not_modified += 1
+                        book.cover_etag = previous.get("cover_etag")
+                        book.cover_last_modified = previous.get("cover_last_modified")
+                        return previous["cover_hash"]
+
+                    if response.status != 200:
+                        print(f"Error: Status {response.status} for {url}")
+                        return None
+
+                    content = await read_body(response)
+                    BYTES_DOWNLOADED.labels("cover").inc(len(content))
+                    book.cover_etag = response.headers.get("ETag")
+                    book.cover_last_modified = response.headers.get("Last-Modified")
+            except (asyncio.TimeoutError, aiohttp.ClientError, ResponseTooLarge) as e:
+                RESPONSES_TOTAL.labels("cover", "error").inc()
+                print(f"Error fetching cover {url}: {e}")
+                return None
+            finally:
+                FETCH_SECONDS.labels("cover").observe(time.perf_counter() - start)
+
+        self.downloaded += 1
+        return await asyncio.get_running_loop().run_in_executor(
+            None, store_cover, content
+        )
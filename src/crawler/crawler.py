@@ -1,61 +1,82 @@
 import asyncio
+import math
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional
 from urllib.parse import urljoin
 
 import aiohttp
 from bs4 import BeautifulSoup
 
+from src.crawler.covers import CoverPipeline
+from src.crawler.transport import (
+    ConnectionStats,
+    ResponseTooLarge,
+    create_session,
+    read_body,
+)
 from src.database.db import init_db
-from src.utils.tag_parsers import parse_category, parse_ratings
-from src.utils.urls import base_url, get_full_url
-
-
-async def fetch_html(session: aiohttp.ClientSession, url: str, semaphore):
-    """Fetch HTML content from URL"""
-    async with semaphore:
+from src.database.models import BookRecord
+from src.utils.metrics import (
+    BOOKS_SCRAPED,
+    BYTES_DOWNLOADED,
+    CRAWL_DURATION_SECONDS,
+    DB_BATCH_SIZE,
+    DB_WRITE_SECONDS,
+    FETCH_SECONDS,
+    PARSE_SECONDS,
+    RESPONSES_TOTAL,
+    acquire_slot,
+)
+from src.utils.profiling import profiled_crawl
+from src.utils.tag_parsers import parse_book_details, parse_page_count
+from src.utils.urls import base_url
+
+CRAWL_MODES = ("auto", "category", "sweep")
+BOOKS_PER_PAGE = 20
+
+
+async def fetch_html(
+    session: aiohttp.ClientSession, url: str, semaphore, page_type: str = "listing"
+) -> Optional[bytes]:
+    """Fetch the raw HTML of a URL (lxml detects the encoding itself)"""
+    async with acquire_slot(semaphore):
+        start = time.perf_counter()
         try:
-            async with session.get(
-                url, timeout=aiohttp.ClientTimeout(total=30)
-            ) as response:
+            async with session.get(url) as response:
+                RESPONSES_TOTAL.labels(page_type, response.status).inc()
                 if response.status == 200:
-                    return await response.text()
+                    html = await read_body(response)
+                    BYTES_DOWNLOADED.labels(page_type).inc(len(html))
+                    return html
                 else:
                     print(f"Error: Status {response.status} for {url}")
-        except asyncio.TimeoutError:
+        except TimeoutError:
+            RESPONSES_TOTAL.labels(page_type, "timeout").inc()
             print(f"Timeout fetching url: {url}")
         except aiohttp.ClientError as e:
+            RESPONSES_TOTAL.labels(page_type, "error").inc()
             print(f"Client error fetching {url}: {e}")
+        except ResponseTooLarge as e:
+            RESPONSES_TOTAL.labels(page_type, "too_large").inc()
+            print(f"Skipping oversized response: {e}")
+        finally:
+            FETCH_SECONDS.labels(page_type).observe(time.perf_counter() - start)
     return None
 
 
-async def fetch_category_links(session: aiohttp.ClientSession, semaphore) -> List[str]:
-    """Fetch all category links"""
-    html = await fetch_html(session, base_url, semaphore)
-    if not html:
-        return []
+@dataclass
+class ListingPage:
+    book_links: List[str]
+    next_url: Optional[str]
+    page_count: Optional[int]
 
-    soup = BeautifulSoup(html, "lxml")
-    links = []
 
-    for link in soup.select("div.side_categories a"):
-        href = link.get("href")
-        if href:
-            full_url = urljoin(base_url, href)
-            links.append(full_url)
-
-    return links[1:]
-
-
-async def fetch_book_links(
-    session: aiohttp.ClientSession, url: str, semaphore
-) -> List[str]:
-    """Fetch all book links from a page"""
-    html = await fetch_html(session, url, semaphore)
-    if not html:
-        return []
-
-    soup = BeautifulSoup(html, "lxml")
+def parse_listing_page(soup: BeautifulSoup, url: str) -> ListingPage:
+    """Book links and pagination of a parsed listing page"""
     links = []
 
     for link in soup.select("article.product_pod"):
@@ -65,75 +86,90 @@ async def fetch_book_links(
             full_url = urljoin(url, href)
             links.append(full_url)
 
-    return links
+    next_url = None
+    next_link = soup.select_one("li.next a")
+    if next_link and next_link.get("href"):
+        next_url = urljoin(url, next_link.get("href"))
 
+    return ListingPage(links, next_url, parse_page_count(soup))
 
-async def fetch_next_page_url(
-    session: aiohttp.ClientSession, current_url: str, semaphore
-) -> Optional[str]:
-    """Fetch next page URL if it exists"""
-    html = await fetch_html(session, current_url, semaphore)
-    if not html:
-        return None
 
-    soup = BeautifulSoup(html, "lxml")
-    next_li = soup.select_one("li.next")
+async def fetch_index(
+    session: aiohttp.ClientSession, semaphore, root_url: str = base_url
+) -> tuple[Dict[str, str], Optional[ListingPage]]:
+    """
+    Fetch every category name and link from the home page
 
-    if next_li:
-        next_link = next_li.select_one("a")
-        if next_link:
-            href = next_link.get("href")
-            return urljoin(current_url, href)
+    The home page is also the first page of the catalogue-wide listing, which
+    is returned alongside the categories (None if the page could not be
+    fetched).
+    """
+    html = await fetch_html(session, root_url, semaphore, page_type="index")
+    if not html:
+        return {}, None
 
-    return None
+    with PARSE_SECONDS.labels("index").time():
+        soup = BeautifulSoup(html, "lxml")
+    categories = {}
 
+    # The first link is the "Books" root, which lists every book
+    for link in soup.select("div.side_categories a")[1:]:
+        href = link.get("href")
+        if href:
+            categories[link.text.strip()] = urljoin(root_url, href)
 
-async def fetch_book_details(
-    session: aiohttp.ClientSession, url: str, semaphore
-) -> Optional[dict]:
-    """Fetch and parse book details"""
-    try:
-        async with semaphore:
-            async with session.get(
-                url, timeout=aiohttp.ClientTimeout(total=30)
-            ) as response:
-                if response.status != 200:
-                    print(f"Error: Status {response.status} for {url}")
-                    return None
+    return categories, parse_listing_page(soup, root_url)
 
-                content = await response.read()
-                book = BeautifulSoup(content, "lxml")
 
-            title = book.find("h1").text
-            cover = get_full_url(book.find("img")["src"])
-            category = parse_category(book)
-            ratings = parse_ratings(book)
-            description = book.find("meta", attrs={"name": "description"}).get(
-                "content"
-            )
+async def fetch_listing_page(
+    session: aiohttp.ClientSession, url: str, semaphore
+) -> Optional[ListingPage]:
+    """Fetch a listing page and parse its book links and pagination"""
+    html = await fetch_html(session, url, semaphore)
+    if not html:
+        return None
 
-            table = book.find("table")
-            information = {}
+    with PARSE_SECONDS.labels("listing").time():
+        soup = BeautifulSoup(html, "lxml")
 
-            for row in table.find_all("tr"):
-                columns = row.find_all(["th", "td"])
-                if len(columns) == 2:
-                    key = columns[0].text.strip()
-                    value = columns[1].text.strip()
+    return parse_listing_page(soup, url)
 
-                    if "Price" in key or key == "Tax":
-                        value = value.replace("Â£", "£")
 
-                    information[key] = value
+async def fetch_book_details(
+    session: aiohttp.ClientSession, url: str, semaphore
+) -> Optional[BookRecord]:
+    """Fetch and parse book details"""
+    try:
+        async with acquire_slot(semaphore):
+            start = time.perf_counter()
+            try:
+                async with session.get(url) as response:
+                    RESPONSES_TOTAL.labels("book", response.status).inc()
+                    if response.status != 200:
+                        print(f"Error: Status {response.status} for {url}")
+                        return None
+
+                    content = await read_body(response)
+                    BYTES_DOWNLOADED.labels("book").inc(len(content))
+            except TimeoutError:
+                RESPONSES_TOTAL.labels("book", "timeout").inc()
+                raise
+            except aiohttp.ClientError:
+                RESPONSES_TOTAL.labels("book", "error").inc()
+                raise
+            except ResponseTooLarge:
+                RESPONSES_TOTAL.labels("book", "too_large").inc()
+                raise
+            finally:
+                FETCH_SECONDS.labels("book").observe(time.perf_counter() - start)
+
+            parse_start = time.perf_counter()
+            book = BookRecord.from_details(
+                parse_book_details(BeautifulSoup(content, "lxml"), url)
+            )
+            PARSE_SECONDS.labels("book").observe(time.perf_counter() - parse_start)
 
-            return {
-                "title": title,
-                "cover": cover,
-                "category": category,
-                "ratings": ratings,
-                "description": description,
-                "information": information,
-            }
+            return book
 
     except Exception as e:
         print(f"Error processing {url}: {e}")
@@ -141,92 +177,340 @@ async def fetch_book_details(
 
 
 async def scrape_page_books(
-    session: aiohttp.ClientSession, page_url: str, semaphore, save_to_db_func=None
-) -> tuple[List[dict], Optional[str]]:
-    """Scrape all books from a page and optionally save to DB"""
-    book_links = await fetch_book_links(session, page_url, semaphore)
+    session: aiohttp.ClientSession,
+    page_url: str,
+    semaphore,
+    save_to_db_func=None,
+    cover_pipeline: Optional[CoverPipeline] = None,
+    listing: Optional[ListingPage] = None,
+) -> tuple[List[BookRecord], Optional[ListingPage]]:
+    """
+    Scrape all books from a page and optionally save to DB
 
-    book_tasks = [fetch_book_details(session, link, semaphore) for link in book_links]
+    `listing` is the already fetched listing page, if any. Returns the books
+    and the listing page, which is None when it could not be fetched.
+    """
+    if listing is None:
+        listing = await fetch_listing_page(session, page_url, semaphore)
+        if listing is None:
+            return [], None
+
+    book_tasks = [
+        fetch_book_details(session, link, semaphore) for link in listing.book_links
+    ]
     books = await asyncio.gather(*book_tasks)
 
     books = [book for book in books if book is not None]
 
+    if cover_pipeline is not None and books:
+        await cover_pipeline.process(books)
+
     # Save to database if function provided
     if save_to_db_func and books:
-        result = save_to_db_func(books)
+        DB_BATCH_SIZE.observe(len(books))
+        with DB_WRITE_SECONDS.time():
+            result = save_to_db_func(books)
         print(f"✓ Saved {result['inserted']} new, updated {result['updated']} books")
 
-    next_url = await fetch_next_page_url(session, page_url, semaphore)
+    return books, listing
 
-    return books, next_url
 
+def listing_page_url(category_url: str, page: int) -> str:
+    """URL of page `page` of a listing, e.g. .../travel_2/page-3.html"""
+    return urljoin(category_url, f"page-{page}.html")
+
+
+async def scrape_listing(
+    session: aiohttp.ClientSession,
+    url: str,
+    semaphore,
+    save_to_db_func=None,
+    cover_pipeline: Optional[CoverPipeline] = None,
+    first: Optional[ListingPage] = None,
+    pages_base: Optional[str] = None,
+) -> List[BookRecord]:
+    """
+    Scrape all books from a paginated listing starting at `url`
+
+    The page count shown on the first page ("Page 1 of N") is used to
+    schedule every remaining page at once. Without it, pages are followed
+    one by one through their "next" links.
+
+    Args:
+        first: The already fetched first page, if any
+        pages_base: URL the page-K.html pages are relative to, defaults
+            to `url`
+    """
+    pages_base = pages_base or url
+
+    if first is None:
+        print(f"Scraping listing page 1: {url}")
+        first = await fetch_listing_page(session, url, semaphore)
+        if first is None:
+            return []
+
+    # Only fan out when the next link follows the page-K.html scheme
+    if (
+        first.page_count
+        and first.page_count > 1
+        and first.next_url == listing_page_url(pages_base, 2)
+    ):
+        print(f"Scraping {first.page_count} pages of {url}")
+        pages = await asyncio.gather(
+            scrape_page_books(
+                session, url, semaphore, save_to_db_func, cover_pipeline, first
+            ),
+            *(
+                scrape_page_books(
+                    session,
+                    listing_page_url(pages_base, page),
+                    semaphore,
+                    save_to_db_func,
+                    cover_pipeline,
+                )
+                for page in range(2, first.page_count + 1)
+            ),
+        )
+        return [book for books, _ in pages for book in books]
 
-async def scrape_category(
-    session: aiohttp.ClientSession, category_url: str, semaphore, save_to_db_func=None
-) -> List[dict]:
-    """Scrape all books from a category (handles pagination)"""
     all_books = []
-    current_url = category_url
+    current_url, listing = url, first
     page_num = 1
 
     while current_url is not None:
-        print(f"Scraping category page {page_num}: {current_url}")
-        books, current_url = await scrape_page_books(
-            session, current_url, semaphore, save_to_db_func
+        if listing is None:
+            print(f"Scraping listing page {page_num}: {current_url}")
+        books, listing = await scrape_page_books(
+            session, current_url, semaphore, save_to_db_func, cover_pipeline, listing
         )
         all_books.extend(books)
+        current_url = listing.next_url if listing is not None else None
+        listing = None
         page_num += 1
 
     return all_books
 
 
-async def scrape_website(save_to_db: bool = True) -> dict:
+async def scrape_category(
+    session: aiohttp.ClientSession,
+    category_url: str,
+    semaphore,
+    save_to_db_func=None,
+    cover_pipeline: Optional[CoverPipeline] = None,
+) -> List[BookRecord]:
+    """Scrape all books from a category (handles pagination)"""
+    return await scrape_listing(
+        session, category_url, semaphore, save_to_db_func, cover_pipeline
+    )
+
+
+def category_listing_pages(
+    books_per_category: dict[str, int], categories: int, books_per_page: int
+) -> int:
+    """Listing pages needed to crawl every category, given their sizes"""
+    pages = sum(
+        max(1, math.ceil(count / books_per_page))
+        for count in books_per_category.values()
+    )
+    # Categories of unknown size cost at least their landing page
+    return pages + max(0, categories - len(books_per_category))
+
+
+@profiled_crawl
+async def scrape_website(
+    save_to_db: bool = True,
+    root_url: str = base_url,
+    save_func: Optional[Callable[[List[BookRecord]], dict]] = None,
+    concurrency: int = 10,
+    fetch_covers: Optional[bool] = None,
+    mode: Optional[str] = None,
+) -> dict:
     """
     Main logic of the crawler
 
     Args:
         save_to_db: If True, saves books to MongoDB as they're scraped
+        root_url: Home page of the site to crawl
+        save_func: Custom sink for each page of scraped books, used instead
+            of MongoDB when given (must return the same counts as
+            `save_books_batch`)
+        concurrency: Maximum number of requests in flight
+        fetch_covers: Download covers and thumbnails to local storage,
+            defaults to the FETCH_COVERS environment variable
+        mode: "category" crawls every category listing, "sweep" crawls the
+            catalogue-wide listing on the home page and takes each book's
+            category from its breadcrumb, and "auto" sweeps when that is
+            estimated to take no more listing requests. Defaults to the
+            CRAWL_MODE environment variable, or "auto"
 
     Returns:
         Dictionary with scraping statistics
     """
-    semaphore = asyncio.Semaphore(10)
+    semaphore = asyncio.Semaphore(concurrency)
     all_books = []
 
-    save_func = None
-    if save_to_db:
-        from src.database.db import save_books_batch
+    if fetch_covers is None:
+        fetch_covers = os.getenv("FETCH_COVERS", "false").lower() == "true"
+
+    mode = mode or os.getenv("CRAWL_MODE", "auto")
+    if mode not in CRAWL_MODES:
+        raise ValueError(f"Unknown crawl mode: {mode}")
+
+    lookup_covers = None
+    count_books_by_category = None
+    checkpoint = None
+    if save_func is None and save_to_db:
+        from src.database.db import (
+            get_category_book_counts,
+            get_cover_fields,
+            record_crawl_run,
+            save_books_batch,
+        )
 
         init_db()
         save_func = save_books_batch
+        lookup_covers = get_cover_fields
+        count_books_by_category = get_category_book_counts
+        checkpoint = record_crawl_run
 
     start_time = datetime.now()
 
-    async with aiohttp.ClientSession() as session:
-        categories = await fetch_category_links(session, semaphore)
+    connections = ConnectionStats()
+
+    async with create_session(concurrency, connections) as session:
+        cover_pipeline = None
+        if fetch_covers:
+            cover_pipeline = CoverPipeline(session, semaphore, lookup_covers)
+
+        categories, index = await fetch_index(session, semaphore, root_url)
         print(f"Found {len(categories)} categories")
 
-        category_tasks = [
-            scrape_category(session, category, semaphore, save_func)
-            for category in categories
-        ]
-        results = await asyncio.gather(*category_tasks)
+        books_per_page = BOOKS_PER_PAGE
+        if index is not None and index.book_links:
+            books_per_page = len(index.book_links)
+
+        if index is None or (mode == "auto" and not index.page_count):
+            mode = "category"
+        elif mode == "auto":
+            # Category sizes from the previous crawl when there is one,
+            # otherwise each category is assumed to fit on a single page
+            known_sizes = {}
+            if count_books_by_category is not None:
+                known_sizes = count_books_by_category()
+            category_pages = category_listing_pages(
+                known_sizes, len(categories), books_per_page
+            )
+            sweep = index.page_count - 1 <= category_pages
+            mode = "sweep" if sweep else "category"
+        print(f"Crawling in {mode} mode")
+
+        if mode == "sweep":
+            tasks = [
+                scrape_listing(
+                    session,
+                    root_url,
+                    semaphore,
+                    save_func,
+                    cover_pipeline,
+                    first=index,
+                    pages_base=urljoin(root_url, "catalogue/"),
+                )
+            ]
+        else:
+            tasks = [
+                scrape_category(session, url, semaphore, save_func, cover_pipeline)
+                for url in categories.values()
+            ]
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            if cover_pipeline is not None:
+                cover_pipeline.close()
 
-        for category_books in results:
-            all_books.extend(category_books)
+        for books in results:
+            all_books.extend(books)
 
     end_time = datetime.now()
     duration = (end_time - start_time).total_seconds()
 
-    return {
+    CRAWL_DURATION_SECONDS.observe(duration)
+    BOOKS_SCRAPED.inc(len(all_books))
+
+    stats = {
         "status": "success",
+        "mode": mode,
         "total_books": len(all_books),
         "duration_seconds": duration,
         "scraped_at": end_time.isoformat(),
         "saved_to_db": save_to_db,
+        # Category name to listing URL, for scheduling targeted recrawls
+        "categories": categories,
+    }
+    if index is not None and index.page_count:
+        # The home page is fetched in both modes and is not counted
+        scraped_sizes = Counter(book.category for book in all_books)
+        requests = {
+            "category": category_listing_pages(
+                scraped_sizes, len(categories), books_per_page
+            ),
+            "sweep": index.page_count - 1,
+        }
+        other = "category" if mode == "sweep" else "sweep"
+        stats["listing_requests"] = requests[mode]
+        # Zero, not negative, when the other mode would have needed fewer
+        stats["listing_requests_saved"] = max(0, requests[other] - requests[mode])
+    if cover_pipeline is not None:
+        stats["covers_downloaded"] = cover_pipeline.downloaded
+        stats["covers_not_modified"] = cover_pipeline.not_modified
+    stats["connections"] = connections.as_dict()
+
+    if checkpoint is not None:
+        checkpoint(stats)
+
+    return stats
+
+
+def run_scraper(save_to_db: bool = True, mode: Optional[str] = None) -> dict:
+    """Entry point of the website crawling algorithm"""
+    return asyncio.run(scrape_website(save_to_db, mode=mode))
+
+
+@profiled_crawl
+async def scrape_single_category(category_url: str, save_to_db: bool = True) -> dict:
+    """Crawl one category, used by targeted recrawls"""
+    concurrency = 10
+    semaphore = asyncio.Semaphore(concurrency)
+
+    save_func = None
+    checkpoint = None
+    if save_to_db:
+        from src.database.db import record_crawl_run, save_books_batch
+
+        init_db()
+        save_func = save_books_batch
+        checkpoint = record_crawl_run
+
+    start_time = datetime.now()
+
+    async with create_session(concurrency) as session:
+        books = await scrape_category(session, category_url, semaphore, save_func)
+
+    end_time = datetime.now()
+
+    stats = {
+        "status": "success",
+        "category_url": category_url,
+        "total_books": len(books),
+        "duration_seconds": (end_time - start_time).total_seconds(),
+        "scraped_at": end_time.isoformat(),
     }
 
+    if checkpoint is not None:
+        checkpoint(stats)
 
-def run_scraper(save_to_db: bool = True) -> dict:
-    """Entry point of the website crawling algorithm"""
-    return asyncio.run(scrape_website(save_to_db))
+    return stats
+
+
+def run_category_scraper(category_url: str, save_to_db: bool = True) -> dict:
+    """Entry point for crawling a single category"""
+    return asyncio.run(scrape_single_category(category_url, save_to_db))
@@ -1,13 +1,23 @@
+import json
 import os
+import re
 from contextlib import asynccontextmanager
-from datetime import datetime
-from typing import Any, Dict, Optional
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, Optional
 
 from bson import ObjectId
 from dotenv import load_dotenv
 from fastapi import FastAPI
-from pymongo import ASCENDING, DESCENDING, MongoClient
+from pymongo import ASCENDING, DESCENDING, MongoClient, ReadPreference, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
 from pymongo.server_api import ServerApi
+from pymongo.write_concern import WriteConcern
+from redis import Redis
+from redis.exceptions import RedisError
+
+from src.database.models import BookRecord
+from src.utils.metrics import MongoCommandMetrics
 
 load_dotenv()
 
@@ -15,55 +25,183 @@ client = None
 db = None
 books_collection = None
 changes_collection = None
+crawl_state_collection = None
+crawl_runs_collection = None
 
+# Redis pub/sub channel that new change documents are published to
+CHANGES_CHANNEL = "books:changes"
+_redis_client = None
 
-def init_db():
-    global client, db, books_collection, changes_collection
+_EPOCH = datetime(1970, 1, 1)
+_MAX_OBJECT_ID = ObjectId("f" * 24)
 
-    if books_collection is not None:
-        return  # Already initialized
+# UPCs on books.toscrape.com are 16 hexadecimal characters
+UPC_PATTERN = re.compile(r"[0-9a-fA-F]{16}")
 
-    uri = os.getenv("MONGO_URL")
-    client = MongoClient(uri, server_api=ServerApi("1"))
-    db = client["books"]
-    books_collection = db["books"]
-    changes_collection = db["changes"]
 
-    # Create indexes
+def create_indexes():
+    """Create the indexes used by the crawler and the API"""
     books_collection.create_index("title")
     books_collection.create_index("category")
     books_collection.create_index("ratings")
     books_collection.create_index("scraped_at")
-    books_collection.create_index([("title", 1), ("category", 1)], unique=True)
+    try:
+        books_collection.create_index(
+            "upc", unique=True, partialFilterExpression={"upc": {"$type": "string"}}
+        )
+        # Books scraped without a UPC are still identified by title/category
+        books_collection.create_index(
+            [("title", ASCENDING), ("category", ASCENDING)],
+            name="title_1_category_1_without_upc",
+            unique=True,
+            partialFilterExpression={"upc": {"$eq": None}},
+        )
+    except OperationFailure as e:
+        print(
+            f"Could not create unique book indexes ({e}); "
+            "run `python -m src.database.migrations` to merge duplicate books"
+        )
 
     changes_collection.create_index([("timestamp", DESCENDING)])
+    # Supports the since-cursor feed, with _id breaking timestamp ties
+    changes_collection.create_index([("timestamp", ASCENDING), ("_id", ASCENDING)])
     changes_collection.create_index("book_id")
     changes_collection.create_index("change_type")
+    changes_collection.create_index(
+        [("category", ASCENDING), ("timestamp", DESCENDING)]
+    )
 
-    print("✓ MongoDB initialized")
+    crawl_state_collection.create_index("category", unique=True)
+    crawl_runs_collection.create_index([("recorded_at", DESCENDING)])
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Lifespan context manager for MongoDB connection"""
-    global client, db, books_collection, changes_collection
+@dataclass
+class ClientProfile:
+    """
+    MongoClient settings for one kind of workload
+
+    Args:
+        max_pool_size: Connections the client may open per server
+        read_preference: Where reads go, e.g. "primary" or "secondaryPreferred"
+        max_staleness_seconds: How far behind the primary a secondary may be
+            to serve reads (at least 90, ignored for "primary")
+        write_concern: Acknowledgement writes wait for, e.g. {"w": 1, "j": False}
+            (the server default when empty)
+    """
+
+    max_pool_size: int = 100
+    read_preference: str = "primary"
+    max_staleness_seconds: Optional[int] = None
+    write_concern: Dict[str, Any] = field(default_factory=dict)
+
+    def client_options(self) -> Dict[str, Any]:
+        options = {
+            "maxPoolSize": self.max_pool_size,
+            "readPreference": self.read_preference,
+        }
+        if self.read_preference != "primary" and self.max_staleness_seconds:
+            options["maxStalenessSeconds"] = self.max_staleness_seconds
+        if "w" in self.write_concern:
+            options["w"] = self.write_concern["w"]
+        if "j" in self.write_concern:
+            options["journal"] = self.write_concern["j"]
+        return options
+
+
+def _parse_w(value: str):
+    w = int(value) if value.isdigit() else value
+    if w == 0:
+        # Change tracking needs the matched counts and upserted ids of writes
+        raise ValueError("Unacknowledged writes (w=0) are not supported")
+    return w
+
+
+def load_profiles() -> Dict[str, ClientProfile]:
+    """
+    Client profiles from the environment
+
+    - api: reads may be served by secondaries at most
+      MONGO_API_MAX_STALENESS_SECONDS behind, so they do not compete with
+      crawl writes on the primary
+    - ingest: crawler writes are acknowledged by the primary alone and are
+      made durable by a majority, journaled checkpoint at the end of a crawl
+      (see `record_crawl_run`)
+
+    Raises:
+        ValueError: A write concern of 0 is configured
+    """
+    api_w = os.getenv("MONGO_API_WRITE_CONCERN")
+    return {
+        "api": ClientProfile(
+            max_pool_size=int(os.getenv("MONGO_API_POOL_SIZE", "100")),
+            read_preference=os.getenv(
+                "MONGO_API_READ_PREFERENCE", "secondaryPreferred"
+            ),
+            max_staleness_seconds=int(
+                os.getenv("MONGO_API_MAX_STALENESS_SECONDS", "90")
+            ),
+            write_concern={"w": _parse_w(api_w)} if api_w else {},
+        ),
+        "ingest": ClientProfile(
+            max_pool_size=int(os.getenv("MONGO_INGEST_POOL_SIZE", "10")),
+            read_preference="primary",
+            write_concern={
+                "w": _parse_w(os.getenv("MONGO_INGEST_WRITE_CONCERN", "1")),
+                "j": os.getenv("MONGO_INGEST_JOURNAL", "false").lower() == "true",
+            },
+        ),
+    }
 
-    uri = os.getenv("MONGO_URL")
 
-    client = MongoClient(uri, server_api=ServerApi("1"))
-    db = client["books"]
+def _connect(profile: str):
+    global client
+
+    options = load_profiles()[profile].client_options()
+    client = MongoClient(
+        os.getenv("MONGO_URL"),
+        server_api=ServerApi("1"),
+        event_listeners=[MongoCommandMetrics()],
+        **options,
+    )
+    use_database(client[os.getenv("MONGO_DB_NAME", "books")])
+
+
+def use_database(database):
+    """Point every collection used by the app at `database`"""
+    global db, books_collection, changes_collection, crawl_state_collection
+    global crawl_runs_collection
+
+    db = database
     books_collection = db["books"]
-    changes_collection = db["changes"]
+    # The change feed pages through recent changes by cursor and the recrawl
+    # planner reads back its own writes, so neither may read a stale secondary
+    changes_collection = db.get_collection(
+        "changes", read_preference=ReadPreference.PRIMARY
+    )
+    crawl_state_collection = db.get_collection(
+        "crawl_state", read_preference=ReadPreference.PRIMARY
+    )
+    crawl_runs_collection = db["crawl_runs"]
 
-    books_collection.create_index("title")
-    books_collection.create_index("category")
-    books_collection.create_index("ratings")
-    books_collection.create_index("scraped_at")
-    books_collection.create_index([("title", 1), ("category", 1)], unique=True)
 
-    changes_collection.create_index([("timestamp", DESCENDING)])
-    changes_collection.create_index("book_id")
-    changes_collection.create_index("change_type")
+def init_db(ensure_indexes: bool = True, profile: str = "ingest"):
+    if books_collection is not None:
+        return  # Already initialized
+
+    _connect(profile)
+
+    if ensure_indexes:
+        create_indexes()
+
+    print(f"✓ MongoDB initialized ({profile} profile)")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Lifespan context manager for MongoDB connection"""
+    _connect("api")
+
+    create_indexes()
 
     print("✓ Connected to MongoDB")
 
@@ -82,58 +220,70 @@ def get_collection():
     return books_collection
 
 
-def extract_price(price_str: str) -> float:
-    """Extract numeric price from string like '£19.99'"""
-    try:
-        return float(price_str.replace("£", "").replace(",", ""))
-    except (ValueError, AttributeError):
-        return 0.0
+def _book_key(book: BookRecord) -> dict:
+    # The UPC is the book's identity; title/category is only a fallback for
+    # pages that are missing a product information table
+    if book.upc:
+        return {"upc": book.upc}
+    return {"title": book.title, "category": book.category}
 
 
-def save_book_to_db(book_data: dict) -> dict:
-    """Save a single book to MongoDB (upsert to avoid duplicates)"""
-    book_data["scraped_at"] = datetime.now()
+def _legacy_key(book: BookRecord) -> dict:
+    # Books saved before the UPC became their identity have no `upc` field
+    # until `src.database.migrations` runs. They are matched on title and
+    # category instead, and the save backfills their `upc`.
+    return {"title": book.title, "category": book.category, "upc": {"$exists": False}}
 
-    # Extract price for easier querying
-    if "information" in book_data and "Price (excl. tax)" in book_data["information"]:
-        book_data["price"] = extract_price(
-            book_data["information"]["Price (excl. tax)"]
-        )
 
-    # Check if book exists for change tracking
-    existing_book = books_collection.find_one(
-        {"title": book_data["title"], "category": book_data["category"]}
-    )
+def _primary(collection):
+    """The collection with reads pinned to the primary"""
+    return collection.with_options(read_preference=ReadPreference.PRIMARY)
 
-    result = books_collection.update_one(
-        {"title": book_data["title"], "category": book_data["category"]},
-        {"$set": book_data},
-        upsert=True,
-    )
 
-    # Track changes
+def _track_changes(book: BookRecord, existing_book: Optional[dict], upserted_id):
+    """Log a new book or a price change after a book was saved"""
     if existing_book:
         # Check for price change
         old_price = existing_book.get("price", 0)
-        new_price = book_data.get("price", 0)
+        new_price = book.price if book.price is not None else 0
         if old_price != new_price:
             log_change(
                 book_id=str(existing_book["_id"]),
                 change_type="price_change",
                 old_value=old_price,
                 new_value=new_price,
-                book_title=book_data["title"],
+                book_title=book.title,
+                category=book.category,
             )
-    else:
+    elif upserted_id:
         # New book added
-        if result.upserted_id:
-            log_change(
-                book_id=str(result.upserted_id),
-                change_type="new_book",
-                old_value=None,
-                new_value=None,
-                book_title=book_data["title"],
-            )
+        log_change(
+            book_id=str(upserted_id),
+            change_type="new_book",
+            old_value=None,
+            new_value=None,
+            book_title=book.title,
+            category=book.category,
+        )
+
+
+def save_book_to_db(book: BookRecord) -> dict:
+    """Save a single book to MongoDB (upsert to avoid duplicates)"""
+    book_data = book.to_document()
+    book_data["scraped_at"] = datetime.now()
+    key = _book_key(book)
+    primary = _primary(books_collection)
+
+    # Check if book exists for change tracking
+    existing_book = primary.find_one(key, {"price": 1})
+    if existing_book is None and book.upc:
+        existing_book = primary.find_one(_legacy_key(book), {"price": 1})
+        if existing_book is not None:
+            key = {"_id": existing_book["_id"]}
+
+    result = books_collection.update_one(key, {"$set": book_data}, upsert=True)
+
+    _track_changes(book, existing_book, result.upserted_id)
 
     return {
         "matched": result.matched_count,
@@ -142,46 +292,115 @@ def save_book_to_db(book_data: dict) -> dict:
     }
 
 
-def save_books_batch(books: list[dict]) -> dict:
-    """Save multiple books to MongoDB in a batch operation"""
+def save_books_batch(books: list[BookRecord]) -> dict:
+    """
+    Save multiple books to MongoDB in a batch operation
+
+    The stored prices are looked up with one query and the books are
+    upserted with one unordered bulk write, so a failed book does not
+    stop the rest of the batch.
+    """
     if not books:
         return {"inserted": 0, "updated": 0, "errors": 0}
 
-    inserted = 0
-    updated = 0
-    errors = 0
-
+    now = datetime.now()
+    primary = _primary(books_collection)
+
+    existing = {}
+    upcs = [book.upc for book in books if book.upc]
+    if upcs:
+        for stored in primary.find({"upc": {"$in": upcs}}, {"price": 1, "upc": 1}):
+            existing[stored["upc"]] = stored
+
+    # Books not found by UPC may still be stored without one (see `_legacy_key`)
+    legacy = {}
+    unmatched = [book.title for book in books if book.upc and book.upc not in existing]
+    if unmatched:
+        for stored in primary.find(
+            {"title": {"$in": unmatched}, "upc": {"$exists": False}},
+            {"price": 1, "title": 1, "category": 1},
+        ):
+            legacy[(stored["title"], stored.get("category"))] = stored
+
+    existing_books = []
+    requests = []
     for book in books:
-        try:
-            result = save_book_to_db(book)
-            if result["upserted_id"]:
-                inserted += 1
-            elif result["modified"] > 0:
-                updated += 1
-        except Exception as e:
-            print(f"Error saving book {book.get('title', 'Unknown')}: {e}")
-            errors += 1
+        key = _book_key(book)
+        if book.upc:
+            existing_book = existing.get(book.upc)
+            if existing_book is None:
+                existing_book = legacy.get((book.title, book.category))
+                if existing_book is not None:
+                    key = {"_id": existing_book["_id"]}
+        else:
+            existing_book = primary.find_one(key, {"price": 1})
+        existing_books.append(existing_book)
+
+        book_data = book.to_document()
+        book_data["scraped_at"] = now
+        requests.append(UpdateOne(key, {"$set": book_data}, upsert=True))
+
+    failed = set()
+    try:
+        result = books_collection.bulk_write(requests, ordered=False).bulk_api_result
+    except BulkWriteError as e:
+        result = e.details
+        for error in result["writeErrors"]:
+            failed.add(error["index"])
+            print(f"Error saving book {books[error['index']].title}: {error['errmsg']}")
+
+    upserted = {entry["index"]: entry["_id"] for entry in result["upserted"]}
+
+    for index, book in enumerate(books):
+        if index not in failed:
+            _track_changes(book, existing_books[index], upserted.get(index))
 
     return {
-        "inserted": inserted,
-        "updated": updated,
-        "errors": errors,
+        "inserted": len(upserted),
+        "updated": result["nModified"],
+        "errors": len(failed),
         "total": len(books),
     }
 
 
-def get_books(
+def record_crawl_run(stats: dict):
+    """
+    Record a finished crawl with a majority, journaled write
+
+    Writes are replicated in order, so once this is acknowledged every write
+    the crawl made before it is durable too, whatever the ingest write
+    concern.
+    """
+    crawl_runs_collection.with_options(
+        write_concern=WriteConcern("majority", j=True)
+    ).insert_one({**stats, "recorded_at": datetime.now()})
+
+
+def get_last_crawl_categories() -> Dict[str, str]:
+    """Category names and listing URLs found by the most recent full crawl"""
+    run = crawl_runs_collection.find_one(
+        {"categories": {"$exists": True}},
+        {"categories": 1},
+        sort=[("recorded_at", DESCENDING)],
+    )
+    return run["categories"] if run else {}
+
+
+SORT_MAPPING = {
+    "rating": ("ratings", DESCENDING),
+    "price": ("price", ASCENDING),
+    "reviews": ("information.Number of reviews", DESCENDING),
+    "title": ("title", ASCENDING),
+}
+
+
+def build_books_query(
     category: Optional[str] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     rating: Optional[int] = None,
-    sort_by: str = "title",
-    page: int = 1,
-    page_size: int = 20,
 ) -> Dict[str, Any]:
-    """
-    Get books with filtering, sorting, and pagination
-    """
+    """Build the MongoDB filter shared by the book listing endpoints"""
     query = {}
     if category:
         query["category"] = category
@@ -194,18 +413,30 @@ def get_books(
     if rating is not None:
         query["ratings"] = rating
 
-    sort_field = sort_by
-    sort_order = ASCENDING
+    return query
+
+
+def get_sort_spec(sort_by: str) -> tuple[str, int]:
+    """Map a public sort key to a (field, direction) pair"""
+    return SORT_MAPPING.get(sort_by, (sort_by, ASCENDING))
 
-    sort_mapping = {
-        "rating": ("ratings", DESCENDING),
-        "price": ("price", ASCENDING),
-        "reviews": ("information.Number of reviews", DESCENDING),
-        "title": ("title", ASCENDING),
-    }
 
-    if sort_by in sort_mapping:
-        sort_field, sort_order = sort_mapping[sort_by]
+def get_books(
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    rating: Optional[int] = None,
+    sort_by: str = "title",
+    page: int = 1,
+    page_size: int = 20,
+) -> Dict[str, Any]:
+    """
+    Get books with filtering, sorting, and pagination
+    """
+    query = build_books_query(
+        category=category, min_price=min_price, max_price=max_price, rating=rating
+    )
+    sort_field, sort_order = get_sort_spec(sort_by)
 
     skip = (page - 1) * page_size
 
@@ -237,10 +468,49 @@ def get_books(
     }
 
 
-def get_book_by_id(book_id: str) -> Optional[dict]:
-    """Get a single book by MongoDB ID"""
+def iter_books(
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    rating: Optional[int] = None,
+    sort_by: str = "title",
+    projection: Optional[Dict[str, Any]] = None,
+    batch_size: int = 500,
+) -> Iterator[dict]:
+    """
+    Stream every book matching the filters straight from a MongoDB cursor
+
+    Documents are fetched from the server `batch_size` at a time, so memory
+    stays constant regardless of the size of the catalog.
+    """
+    query = build_books_query(
+        category=category, min_price=min_price, max_price=max_price, rating=rating
+    )
+    sort_field, sort_order = get_sort_spec(sort_by)
+
+    cursor = (
+        books_collection.find(query, projection)
+        .sort(sort_field, sort_order)
+        .batch_size(batch_size)
+    )
     try:
-        book = books_collection.find_one({"_id": ObjectId(book_id)})
+        for book in cursor:
+            book["_id"] = str(book["_id"])
+            yield book
+    finally:
+        cursor.close()
+
+
+def get_book_by_id(book_id: str, primary: bool = False) -> Optional[dict]:
+    """
+    Get a single book by MongoDB ID
+
+    Pass `primary=True` to read it back right after writing it, since
+    secondaries may not have the write yet.
+    """
+    collection = _primary(books_collection) if primary else books_collection
+    try:
+        book = collection.find_one({"_id": ObjectId(book_id)})
         if book:
             book["_id"] = str(book["_id"])
         return book
@@ -249,24 +519,209 @@ def get_book_by_id(book_id: str) -> Optional[dict]:
         return None
 
 
+def get_books_by_ids(
+    ids: list[str], projection: Optional[Dict[str, Any]] = None
+) -> list[dict]:
+    """
+    Look up many books at once by MongoDB ObjectId or UPC
+
+    All ids are resolved with a single `$in` query. Returns one entry per
+    requested id, in request order, with a status of "found", "not_found" or
+    "invalid".
+    """
+    object_ids = {}
+    upcs = set()
+    for book_id in ids:
+        if ObjectId.is_valid(book_id):
+            object_ids[book_id] = ObjectId(book_id)
+        elif UPC_PATTERN.fullmatch(book_id):
+            upcs.add(book_id)
+
+    clauses = []
+    if object_ids:
+        clauses.append({"_id": {"$in": list(object_ids.values())}})
+    if upcs:
+        clauses.append({"upc": {"$in": list(upcs)}})
+
+    if projection is not None:
+        # Needed to match documents back to the ids they were requested by
+        projection = {**projection, "_id": 1, "upc": 1}
+
+    by_id = {}
+    by_upc = {}
+    if clauses:
+        for book in books_collection.find({"$or": clauses}, projection):
+            book["_id"] = str(book["_id"])
+            by_id[book["_id"]] = book
+            if book.get("upc"):
+                by_upc[book["upc"]] = book
+
+    results = []
+    for book_id in ids:
+        if book_id in object_ids:
+            book = by_id.get(book_id)
+        elif book_id in upcs:
+            book = by_upc.get(book_id)
+        else:
+            results.append({"id": book_id, "status": "invalid", "book": None})
+            continue
+
+        status = "found" if book else "not_found"
+        results.append({"id": book_id, "status": status, "book": book})
+
+    return results
+
+
+def get_book_by_upc(upc: str) -> Optional[dict]:
+    """Get a single book by its UPC"""
+    book = books_collection.find_one({"upc": upc})
+    if book:
+        book["_id"] = str(book["_id"])
+    return book
+
+
+def get_cover_fields(upcs: list[str]) -> dict[str, dict]:
+    """Get the stored cover URL, hash and HTTP validators of books by UPC"""
+    cursor = books_collection.find(
+        {"upc": {"$in": upcs}},
+        {
+            "upc": 1,
+            "cover": 1,
+            "cover_hash": 1,
+            "cover_etag": 1,
+            "cover_last_modified": 1,
+        },
+    )
+    return {book["upc"]: book for book in cursor}
+
+
 def get_book_count():
     """Get total count of books in database"""
     return books_collection.count_documents({})
 
 
 def log_change(
-    book_id: str, change_type: str, old_value: Any, new_value: Any, book_title: str
+    book_id: str,
+    change_type: str,
+    old_value: Any,
+    new_value: Any,
+    book_title: str,
+    category: Optional[str] = None,
 ):
     """Log a change to the changes collection"""
     change_doc = {
         "book_id": book_id,
         "book_title": book_title,
+        "category": category,
         "change_type": change_type,
         "old_value": old_value,
         "new_value": new_value,
         "timestamp": datetime.now(),
     }
     changes_collection.insert_one(change_doc)
+    publish_change(change_doc)
+
+
+def get_redis():
+    """Get a shared Redis client, or None when REDIS_URL is not configured"""
+    global _redis_client
+
+    if _redis_client is None and os.getenv("REDIS_URL"):
+        _redis_client = Redis.from_url(os.getenv("REDIS_URL"))
+
+    return _redis_client
+
+
+def serialize_change(change: dict) -> dict:
+    """Convert a change document into a JSON-safe dict carrying its feed cursor"""
+    return {
+        **change,
+        "_id": str(change["_id"]),
+        "timestamp": change["timestamp"].isoformat(),
+        "cursor": encode_change_cursor(change),
+    }
+
+
+def publish_change(change_doc: dict):
+    """Fan a freshly logged change out to live subscribers (best effort)"""
+    redis_client = get_redis()
+    if redis_client is None:
+        return
+
+    try:
+        redis_client.publish(CHANGES_CHANNEL, json.dumps(serialize_change(change_doc)))
+    except RedisError as e:
+        print(f"Error publishing change for {change_doc['book_id']}: {e}")
+
+
+def encode_change_cursor(change: dict) -> str:
+    """
+    Build an opaque feed cursor from a change's timestamp and id
+
+    MongoDB stores datetimes with millisecond precision, so the timestamp is
+    encoded in milliseconds and the ObjectId breaks ties between changes
+    logged within the same millisecond.
+    """
+    millis = (change["timestamp"] - _EPOCH) // timedelta(milliseconds=1)
+    return f"{millis}_{change['_id']}"
+
+
+def decode_change_cursor(cursor: str) -> tuple[datetime, ObjectId]:
+    """Inverse of `encode_change_cursor`, raises ValueError on malformed input"""
+    try:
+        millis, object_id = cursor.split("_", 1)
+        return _EPOCH + timedelta(milliseconds=int(millis)), ObjectId(object_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def timestamp_cursor(timestamp: datetime) -> str:
+    """
+    Feed cursor that is past every change logged up to `timestamp`
+
+    Change timestamps are naive local times, like every time the app stores,
+    so timestamps with an offset are converted to local time and naive ones
+    are taken as local already.
+    """
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    return encode_change_cursor({"timestamp": timestamp, "_id": _MAX_OBJECT_ID})
+
+
+def _changes_after(cursor: str) -> Dict[str, Any]:
+    timestamp, object_id = decode_change_cursor(cursor)
+    return {
+        "$or": [
+            {"timestamp": {"$gt": timestamp}},
+            {"timestamp": timestamp, "_id": {"$gt": object_id}},
+        ]
+    }
+
+
+def get_changes_since(
+    cursor: str, limit: int = 50, change_type: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Get changes recorded after `cursor`, oldest first
+
+    Returns the changes along with the cursor to resume from on the next call.
+    """
+    query = _changes_after(cursor)
+    if change_type:
+        query["change_type"] = change_type
+
+    changes = list(
+        changes_collection.find(query)
+        .sort([("timestamp", ASCENDING), ("_id", ASCENDING)])
+        .limit(limit)
+    )
+
+    next_cursor = encode_change_cursor(changes[-1]) if changes else cursor
+
+    for change in changes:
+        change["_id"] = str(change["_id"])
+
+    return {"changes": changes, "next_cursor": next_cursor}
 
 
 def get_recent_changes(limit: int = 50, change_type: Optional[str] = None) -> list:
@@ -276,10 +731,110 @@ def get_recent_changes(limit: int = 50, change_type: Optional[str] = None) -> li
         query["change_type"] = change_type
 
     changes = list(
-        changes_collection.find(query).sort("timestamp", DESCENDING).limit(limit)
+        changes_collection.find(query)
+        .sort([("timestamp", DESCENDING), ("_id", DESCENDING)])
+        .limit(limit)
     )
 
     for change in changes:
         change["_id"] = str(change["_id"])
 
     return changes
+
+
+def get_latest_change_cursor() -> Optional[str]:
+    """Cursor pointing at the newest change, for consumers starting a feed"""
+    latest = changes_collection.find_one(
+        {}, sort=[("timestamp", DESCENDING), ("_id", DESCENDING)]
+    )
+    return encode_change_cursor(latest) if latest else None
+
+
+def iter_changes(
+    since: Optional[str] = None,
+    change_type: Optional[str] = None,
+    batch_size: int = 500,
+) -> Iterator[dict]:
+    """
+    Stream changes in chronological order, optionally only those after the
+    feed cursor `since`
+    """
+    query: Dict[str, Any] = _changes_after(since) if since is not None else {}
+    if change_type:
+        query["change_type"] = change_type
+
+    cursor = (
+        changes_collection.find(query)
+        .sort([("timestamp", ASCENDING), ("_id", ASCENDING)])
+        .batch_size(batch_size)
+    )
+    try:
+        for change in cursor:
+            change["_id"] = str(change["_id"])
+            yield change
+    finally:
+        cursor.close()
+
+
+def get_category_change_counts(since: datetime) -> Dict[str, int]:
+    """
+    Count changes per category logged after `since`
+
+    Changes logged before categories were recorded on change documents are
+    attributed through their book.
+    """
+    counts: Dict[str, int] = {}
+
+    recorded = changes_collection.aggregate(
+        [
+            {"$match": {"timestamp": {"$gt": since}, "category": {"$type": "string"}}},
+            {"$group": {"_id": "$category", "count": {"$sum": 1}}},
+        ]
+    )
+    legacy = changes_collection.aggregate(
+        [
+            {"$match": {"timestamp": {"$gt": since}, "category": {"$exists": False}}},
+            {"$group": {"_id": "$book_id", "count": {"$sum": 1}}},
+            {
+                "$lookup": {
+                    "from": books_collection.name,
+                    "let": {"book_id": {"$toObjectId": "$_id"}},
+                    "pipeline": [
+                        {"$match": {"$expr": {"$eq": ["$_id", "$$book_id"]}}},
+                        {"$project": {"category": 1}},
+                    ],
+                    "as": "book",
+                }
+            },
+            {"$unwind": "$book"},
+            {"$group": {"_id": "$book.category", "count": {"$sum": "$count"}}},
+        ]
+    )
+
+    for group in [*recorded, *legacy]:
+        if group["_id"] is not None:
+            counts[group["_id"]] = counts.get(group["_id"], 0) + group["count"]
+
+    return counts
+
+
+def get_category_book_counts() -> Dict[str, int]:
+    """Count books per category"""
+    pipeline = [{"$group": {"_id": "$category", "count": {"$sum": 1}}}]
+    return {
+        group["_id"]: group["count"]
+        for group in books_collection.aggregate(pipeline)
+        if group["_id"] is not None
+    }
+
+
+def get_crawl_state() -> Dict[str, dict]:
+    """Get the recrawl bookkeeping of every known category"""
+    return {state["category"]: state for state in crawl_state_collection.find()}
+
+
+def update_crawl_state(category: str, **fields):
+    """Update (or create) the recrawl bookkeeping of a category"""
+    crawl_state_collection.update_one(
+        {"category": category}, {"$set": fields}, upsert=True
+    )
@@ -0,0 +1,64 @@
+"""
+One-off data migrations
+
+Run with `uv run python -m src.database.migrations` from the project root.
+"""
+
+from pymongo.errors import OperationFailure
+
+from src.database import db
+
+
+def migrate_upc_identity() -> dict:
+    """
+    Promote `information.UPC` to the top-level `upc` identity field
+
+    Books used to be keyed on (title, category). This backfills `upc`, merges
+    books sharing a UPC into the most recently scraped document (repointing
+    their change history at it), then swaps the old unique index for the
+    unique `upc` index and a unique title/category index on books without one.
+    """
+    db.init_db(ensure_indexes=False)
+    books = db.books_collection
+    changes = db.changes_collection
+
+    backfilled = books.update_many(
+        {"upc": {"$exists": False}, "information.UPC": {"$type": "string"}},
+        [{"$set": {"upc": "$information.UPC"}}],
+    ).modified_count
+
+    duplicates = books.aggregate(
+        [
+            {"$match": {"upc": {"$type": "string"}}},
+            {"$sort": {"scraped_at": -1}},
+            {"$group": {"_id": "$upc", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+        ],
+        allowDiskUse=True,
+    )
+
+    merged = 0
+    for group in duplicates:
+        keep, *stale = group["ids"]
+        changes.update_many(
+            {"book_id": {"$in": [str(book_id) for book_id in stale]}},
+            {"$set": {"book_id": str(keep)}},
+        )
+        merged += books.delete_many({"_id": {"$in": stale}}).deleted_count
+
+    try:
+        books.drop_index("title_1_category_1")
+    except OperationFailure:
+        pass  # Index was never created or has already been dropped
+
+    db.create_indexes()
+
+    return {"backfilled": backfilled, "merged": merged}
+
+
+if __name__ == "__main__":
+    result = migrate_upc_identity()
+    print(
+        f"✓ Backfilled UPC on {result['backfilled']} books, "
+        f"merged {result['merged']} duplicates"
+    )
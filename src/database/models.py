@@ -1,16 +1,98 @@
-from datetime import datetime
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
+# Upper bound on ids accepted by a single batch lookup
+MAX_BATCH_IDS = 500
+
+
+def parse_price(value: Optional[str]) -> Optional[float]:
+    """Numeric value of a price string like '£19.99'"""
+    try:
+        return float(value.replace("£", "").replace(",", ""))
+    except (ValueError, AttributeError):
+        return None
+
+
+@dataclass(slots=True)
+class BookRecord:
+    """
+    A scraped book, as it moves from the crawler to the database
+
+    `information` is the product information table exactly as scraped and is
+    stored unchanged. The price is parsed from it once, when the book is
+    scraped, and is None when the row is missing or does not parse.
+    """
 
-class BookDetails(BaseModel):
     title: str
-    cover: str
-    category: str
-    ratings: int
-    description: str
-    information: Dict[str, Any]
-    retrieved_at: datetime = None
-
-    class Config:
-        json_encoders = {datetime: lambda v: v.isoformat()}
+    url: Optional[str]
+    cover: Optional[str]
+    category: Optional[str]
+    ratings: Optional[int]
+    description: Optional[str]
+    information: Dict[str, str] = field(default_factory=dict)
+    upc: Optional[str] = None
+    price: Optional[float] = None
+    # Set by the cover pipeline
+    cover_hash: Optional[str] = None
+    cover_path: Optional[str] = None
+    thumbnail_path: Optional[str] = None
+    cover_etag: Optional[str] = None
+    cover_last_modified: Optional[str] = None
+
+    @classmethod
+    def from_details(cls, details: Dict[str, Any]) -> "BookRecord":
+        """Build a record from the dict returned by `parse_book_details`"""
+        information = details.get("information") or {}
+
+        return cls(
+            title=details["title"],
+            url=details.get("url"),
+            cover=details.get("cover"),
+            category=details.get("category"),
+            ratings=details.get("ratings"),
+            description=details.get("description"),
+            information=information,
+            upc=information.get("UPC"),
+            price=parse_price(information.get("Price (excl. tax)")),
+        )
+
+    def to_document(self) -> Dict[str, Any]:
+        """Fields to `$set` on the book's MongoDB document"""
+        document = {
+            "title": self.title,
+            "url": self.url,
+            "cover": self.cover,
+            "category": self.category,
+            "ratings": self.ratings,
+            "description": self.description,
+            "information": self.information,
+        }
+        if self.price is not None:
+            document["price"] = self.price
+        if self.upc:
+            document["upc"] = self.upc
+
+        # Left unset when covers are not fetched, so stored ones are kept
+        if self.cover_hash is not None:
+            document["cover_hash"] = self.cover_hash
+            document["cover_path"] = self.cover_path
+            if self.thumbnail_path is not None:
+                document["thumbnail_path"] = self.thumbnail_path
+            document["cover_etag"] = self.cover_etag
+            document["cover_last_modified"] = self.cover_last_modified
+
+        return document
+
+
+class BookBatchRequest(BaseModel):
+    ids: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_IDS,
+        description="MongoDB ObjectIds and/or UPCs of the books to fetch",
+    )
+    fields: Optional[List[str]] = Field(
+        None, description="Only return these fields (defaults to all fields)"
+    )
@@ -0,0 +1,208 @@
+"""
+Change-rate-driven recrawl planning
+
+Each category is modelled as changing at a Poisson rate estimated from the
+`changes` collection. Given a budget of requests per hour, crawl frequencies
+are chosen to maximise the expected fraction of books that are fresh, i.e.
+unchanged since their category was last crawled. Volatile categories are
+crawled often and stable ones rarely, for no more requests than the budget.
+"""
+
+import math
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+BOOKS_PER_PAGE = 20
+
+# Bounds on how often a single category is recrawled
+MIN_INTERVAL_HOURS = float(os.getenv("RECRAWL_MIN_INTERVAL_HOURS", "1"))
+MAX_INTERVAL_HOURS = float(os.getenv("RECRAWL_MAX_INTERVAL_HOURS", str(7 * 24)))
+# History used to estimate change rates
+WINDOW_DAYS = int(os.getenv("RECRAWL_WINDOW_DAYS", "14"))
+# Pseudo-count of changes per window, so quiet categories keep a small rate
+PRIOR_CHANGES = 1.0
+
+
+@dataclass
+class CategoryPlan:
+    category: str
+    books: int
+    change_rate: float  # expected changes per hour
+    cost: int  # requests per crawl
+    interval_hours: float
+
+    @property
+    def requests_per_hour(self) -> float:
+        return self.cost / self.interval_hours
+
+
+def crawl_cost(books: int) -> int:
+    """Requests needed to crawl a category: its listing pages plus detail pages"""
+    return max(1, math.ceil(books / BOOKS_PER_PAGE)) + books
+
+
+def estimate_change_rate(changes: int, window_hours: float) -> float:
+    """Smoothed changes per hour for a category"""
+    return (changes + PRIOR_CHANGES) / window_hours
+
+
+def expected_freshness(rate: float, frequency: float) -> float:
+    """
+    Expected fraction of time a page changing at `rate` is up to date when
+    crawled `frequency` times per hour: (1 - e^-x) / x with x = rate / frequency
+    """
+    x = rate / frequency
+    if x < 1e-9:
+        return 1.0
+    return -math.expm1(-x) / x
+
+
+def _marginal_freshness(rate: float, frequency: float) -> float:
+    """Derivative of expected_freshness with respect to frequency"""
+    x = rate / frequency
+    return -(math.expm1(-x) + x * math.exp(-x)) / rate
+
+
+def _best_frequency(
+    weight: float, rate: float, cost: int, price: float, low: float, high: float
+) -> float:
+    """Frequency where weighted marginal freshness equals `price` per request"""
+    if weight * _marginal_freshness(rate, low) <= price * cost:
+        return low
+    if weight * _marginal_freshness(rate, high) >= price * cost:
+        return high
+
+    for _ in range(60):
+        mid = (low + high) / 2
+        if weight * _marginal_freshness(rate, mid) > price * cost:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+def allocate(
+    books: Dict[str, int],
+    change_rates: Dict[str, float],
+    budget_per_hour: float,
+    min_interval_hours: float = MIN_INTERVAL_HOURS,
+    max_interval_hours: float = MAX_INTERVAL_HOURS,
+) -> Dict[str, CategoryPlan]:
+    """
+    Choose a recrawl interval per category within a request budget
+
+    Maximises the book-weighted expected freshness subject to the total
+    requests per hour staying within `budget_per_hour`, by bisecting on the
+    price of a request (the Lagrange multiplier of the budget constraint).
+    If even the longest interval for every category exceeds the budget,
+    every category gets the longest interval.
+    """
+    low, high = 1 / max_interval_hours, 1 / min_interval_hours
+    costs = {category: crawl_cost(count) for category, count in books.items()}
+
+    def frequencies(price: float) -> Dict[str, float]:
+        return {
+            category: _best_frequency(
+                books[category],
+                change_rates[category],
+                costs[category],
+                price,
+                low,
+                high,
+            )
+            for category in books
+        }
+
+    def spend(freqs: Dict[str, float]) -> float:
+        return sum(costs[category] * freq for category, freq in freqs.items())
+
+    if spend(frequencies(0.0)) <= budget_per_hour:
+        freqs = frequencies(0.0)
+    else:
+        price_low, price_high = 0.0, 1.0
+        while spend(frequencies(price_high)) > budget_per_hour and price_high < 1e12:
+            price_high *= 2
+        for _ in range(60):
+            price = (price_low + price_high) / 2
+            if spend(frequencies(price)) > budget_per_hour:
+                price_low = price
+            else:
+                price_high = price
+        freqs = frequencies(price_high)
+
+    return {
+        category: CategoryPlan(
+            category=category,
+            books=books[category],
+            change_rate=change_rates[category],
+            cost=costs[category],
+            interval_hours=1 / freq,
+        )
+        for category, freq in freqs.items()
+    }
+
+
+def default_budget(books: Dict[str, int]) -> float:
+    """
+    Requests per hour matching the fixed schedule of one full crawl a day,
+    less what the weekly full crawl that still runs alongside recrawls uses
+    """
+    full_crawl = sum(crawl_cost(count) for count in books.values())
+    return full_crawl / 24 - full_crawl / (7 * 24)
+
+
+def plan_recrawls(
+    budget_per_hour: Optional[float] = None, now: Optional[datetime] = None
+) -> Dict[str, CategoryPlan]:
+    """Estimate change rates from the database and allocate recrawl intervals"""
+    from src.database.db import get_category_book_counts, get_category_change_counts
+
+    now = now or datetime.now()
+    books = get_category_book_counts()
+    changes = get_category_change_counts(since=now - timedelta(days=WINDOW_DAYS))
+
+    window_hours = WINDOW_DAYS * 24
+    change_rates = {
+        category: estimate_change_rate(changes.get(category, 0), window_hours)
+        for category in books
+    }
+
+    if budget_per_hour is None:
+        budget_per_hour = float(
+            os.getenv("RECRAWL_BUDGET_PER_HOUR", default_budget(books))
+        )
+
+    return allocate(books, change_rates, budget_per_hour)
+
+
+def due_categories(
+    plans: Dict[str, CategoryPlan], state: Dict[str, dict], now: datetime
+) -> list[str]:
+    """Categories whose planned interval has elapsed since they were last crawled"""
+    due = []
+    for category, plan in plans.items():
+        category_state = state.get(category, {})
+        last_crawled = category_state.get("last_crawled_at")
+        scheduled = category_state.get("scheduled_at")
+
+        # A crawl is already queued, has not finished yet and is not stale
+        if (
+            scheduled
+            and (last_crawled is None or scheduled > last_crawled)
+            and now - scheduled < timedelta(hours=plan.interval_hours)
+        ):
+            continue
+
+        if last_crawled is None or now - last_crawled >= timedelta(
+            hours=plan.interval_hours
+        ):
+            due.append(category)
+
+    # Most overdue first, so a partial run favours the stalest categories
+    return sorted(
+        due,
+        key=lambda category: state.get(category, {}).get("last_crawled_at")
+        or datetime.min,
+    )
@@ -5,6 +5,8 @@ from celery import Celery
 from celery.schedules import crontab
 from dotenv import load_dotenv
 
+from src.utils.metrics import push_metrics
+
 load_dotenv()
 
 app = Celery(
@@ -19,12 +21,30 @@ app.conf.update(
     enable_utc=False,
 )
 
-app.conf.beat_schedule = {
-    "scrape-books-daily-12pm": {
-        "task": "src.scheduler.scheduler.scrape_books_task",
-        "schedule": crontab(hour=12, minute=30),  # Run at 12:30 PM every day
-    },
-}
+# With adaptive recrawling, categories are recrawled on intervals derived from
+# how often they change, and the full crawl only runs weekly to pick up new
+# categories
+ADAPTIVE_RECRAWL = os.getenv("ADAPTIVE_RECRAWL", "false").lower() == "true"
+
+if ADAPTIVE_RECRAWL:
+    app.conf.beat_schedule = {
+        "plan-recrawls": {
+            "task": "src.scheduler.scheduler.plan_recrawls_task",
+            "schedule": crontab(minute="*/15"),
+        },
+        "scrape-books-weekly": {
+            "task": "src.scheduler.scheduler.scrape_books_task",
+            # Run at 12:30 PM every Sunday
+            "schedule": crontab(hour=12, minute=30, day_of_week=0),
+        },
+    }
+else:
+    app.conf.beat_schedule = {
+        "scrape-books-daily-12pm": {
+            "task": "src.scheduler.scheduler.scrape_books_task",
+            "schedule": crontab(hour=12, minute=30),  # Run at 12:30 PM every day
+        },
+    }
 
 
 @app.task(bind=True, name="src.scheduler.scheduler.scrape_books_task")
@@ -41,6 +61,16 @@ def scrape_books_task(self):
 
         print(f"Scrape completed: {result}")
 
+        if ADAPTIVE_RECRAWL:
+            from src.database.db import update_crawl_state
+
+            # Every category was just crawled, which resets its recrawl clock
+            finished_at = datetime.now()
+            for category, url in result.get("categories", {}).items():
+                update_crawl_state(category, url=url, last_crawled_at=finished_at)
+
+        push_metrics(job="bookscrapper_crawl")
+
         return {
             "status": "success",
             "timestamp": datetime.now().isoformat(),
@@ -52,3 +82,81 @@ def scrape_books_task(self):
         print(f"Error in scrape task: {e}")
         # Retry after 5 minutes if failed
         self.retry(exc=e, countdown=300, max_retries=3)
+
+
+@app.task(name="src.scheduler.scheduler.plan_recrawls_task")
+def plan_recrawls_task():
+    """
+    Queue targeted crawls of the categories whose recrawl interval has elapsed
+    """
+    from src.database.db import (
+        get_crawl_state,
+        get_last_crawl_categories,
+        init_db,
+        update_crawl_state,
+    )
+    from src.scheduler.adaptive import due_categories, plan_recrawls
+
+    init_db()
+    now = datetime.now()
+
+    plans = plan_recrawls(now=now)
+    state = get_crawl_state()
+    due = due_categories(plans, state, now)
+
+    if any(not state.get(category, {}).get("url") for category in due):
+        # Categories are discovered by full crawls, which record their URLs
+        for category, url in get_last_crawl_categories().items():
+            update_crawl_state(category, url=url)
+        state = get_crawl_state()
+
+    scheduled = []
+    for category in due:
+        url = state.get(category, {}).get("url")
+        if not url:
+            print(f"No URL known for category {category}, skipping")
+            continue
+
+        plan = plans[category]
+        update_crawl_state(
+            category,
+            scheduled_at=now,
+            interval_hours=plan.interval_hours,
+            change_rate=plan.change_rate,
+        )
+        scrape_category_task.delay(category, url)
+        scheduled.append(category)
+
+    print(f"Planned {len(plans)} categories, scheduled {len(scheduled)} recrawls")
+
+    return {
+        "status": "success",
+        "timestamp": now.isoformat(),
+        "planned_requests_per_hour": sum(
+            plan.requests_per_hour for plan in plans.values()
+        ),
+        "scheduled": scheduled,
+    }
+
+
+@app.task(bind=True, name="src.scheduler.scheduler.scrape_category_task")
+def scrape_category_task(self, category: str, url: str):
+    """
+    Celery task to recrawl a single category and save it to MongoDB
+    """
+    try:
+        from src.crawler.crawler import run_category_scraper
+        from src.database.db import update_crawl_state
+
+        result = run_category_scraper(url, save_to_db=True)
+        update_crawl_state(category, last_crawled_at=datetime.now())
+
+        print(f"Recrawl of {category} completed: {result}")
+
+        push_metrics(job="bookscrapper_recrawl")
+
+        return result
+
+    except Exception as e:
+        print(f"Error recrawling {category}: {e}")
+        self.retry(exc=e, countdown=300, max_retries=3)
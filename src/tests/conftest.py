@@ -0,0 +1,42 @@
+import mongomock
+import pytest
+from mongomock.collection import BulkOperationBuilder
+
+from database import db
+from src.database import db as src_db
+
+COLLECTIONS = [
+    "db",
+    "books_collection",
+    "changes_collection",
+    "crawl_state_collection",
+    "crawl_runs_collection",
+]
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    """
+    An empty mongomock database with the app's indexes
+
+    Tests import `database.db` while the app imports `src.database.db`, so
+    both module instances are pointed at it.
+    """
+    # pymongo passes the `sort` option of update operations to bulk builders,
+    # which mongomock's does not accept yet
+    add_update = BulkOperationBuilder.add_update
+    monkeypatch.setattr(
+        BulkOperationBuilder,
+        "add_update",
+        lambda self, *args, sort=None, **kwargs: add_update(self, *args, **kwargs),
+    )
+
+    database = mongomock.MongoClient()["books"]
+    for module in (db, src_db):
+        # Registers the current collections so they are restored afterwards
+        for name in COLLECTIONS:
+            monkeypatch.setattr(module, name, getattr(module, name))
+        module.use_database(database)
+
+    db.create_indexes()
+    return database
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from scheduler.adaptive import allocate, crawl_cost, due_categories
+
+
+def test_allocate_stays_within_budget():
+    """Test the planned requests per hour never exceed the budget"""
+    books = {"Fiction": 1000, "Poetry": 20, "Travel": 100}
+    rates = {"Fiction": 0.5, "Poetry": 0.001, "Travel": 0.05}
+    budget = 200.0
+
+    plans = allocate(books, rates, budget)
+
+    spent = sum(plan.requests_per_hour for plan in plans.values())
+    assert spent == pytest.approx(budget, rel=1e-3) or spent < budget
+
+
+def test_volatile_categories_are_crawled_more_often():
+    """Test a category that changes more often gets a shorter interval"""
+    books = {"Volatile": 100, "Stable": 100}
+    rates = {"Volatile": 0.2, "Stable": 0.002}
+
+    plans = allocate(books, rates, budget_per_hour=crawl_cost(100) / 4)
+
+    assert plans["Volatile"].interval_hours < plans["Stable"].interval_hours
+
+
+def test_intervals_respect_bounds():
+    """Test intervals are clamped when the budget is tiny or unlimited"""
+    books = {"Fiction": 1000, "Poetry": 20}
+    rates = {"Fiction": 0.5, "Poetry": 0.001}
+
+    starved = allocate(books, rates, 0.0, min_interval_hours=1, max_interval_hours=48)
+    generous = allocate(books, rates, 1e9, min_interval_hours=1, max_interval_hours=48)
+
+    assert all(plan.interval_hours == pytest.approx(48) for plan in starved.values())
+    assert all(plan.interval_hours == pytest.approx(1) for plan in generous.values())
+
+
+def test_due_categories_skips_queued_crawls():
+    """Test categories are due once their interval elapses, unless already queued"""
+    now = datetime(2024, 1, 1, 12)
+    plans = allocate({"A": 20, "B": 20, "C": 20}, {"A": 0.1, "B": 0.1, "C": 0.1}, 1e9)
+    state = {
+        "A": {"last_crawled_at": now - timedelta(hours=2)},
+        "B": {
+            "last_crawled_at": now - timedelta(hours=2),
+            "scheduled_at": now - timedelta(minutes=15),
+        },
+    }
+
+    assert due_categories(plans, state, now) == ["C", "A"]
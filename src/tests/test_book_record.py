@@ -0,0 +1,58 @@
+from database.models import BookRecord
+
+DETAILS = {
+    "title": "Meditations",
+    "url": "https://books.toscrape.com/catalogue/meditations_33/index.html",
+    "cover": "https://books.toscrape.com/media/cache/90/f7/90f79652caecac36bc97bf7b769c8fc4.jpg",
+    "category": "Philosophy",
+    "ratings": 2,
+    "description": "Written in Greek, without any intention of publication",
+    "information": {
+        "UPC": "4f19709e47883df5",
+        "Product Type": "Books",
+        "Price (excl. tax)": "£25.89",
+        "Price (incl. tax)": "£25.89",
+        "Tax": "£0.00",
+        "Availability": "In stock (1 available)",
+        "Number of reviews": "0",
+    },
+}
+
+
+def test_price_and_upc_are_parsed():
+    """Test the price and UPC are read from the information table"""
+    book = BookRecord.from_details(DETAILS)
+
+    assert book.upc == "4f19709e47883df5"
+    assert book.price == 25.89
+
+
+def test_document_keeps_information_strings():
+    """Test the stored document matches what was scraped, plus price and upc"""
+    document = BookRecord.from_details(DETAILS).to_document()
+
+    assert document["information"] == DETAILS["information"]
+    assert list(document["information"]) == list(DETAILS["information"])
+    assert document["price"] == 25.89
+    assert document["upc"] == "4f19709e47883df5"
+    assert "cover_hash" not in document
+
+
+def test_missing_and_unparseable_rows():
+    """Test rows that are missing or do not parse are stored as scraped"""
+    information = {"UPC": "abc", "Price (excl. tax)": "N/A", "ISBN": "123"}
+    book = BookRecord.from_details({**DETAILS, "information": information})
+    document = book.to_document()
+
+    assert book.price is None
+    assert "price" not in document
+    assert document["information"] == information
+
+
+def test_missing_information_table():
+    """Test a page without an information table stores an empty one"""
+    details = {key: value for key, value in DETAILS.items() if key != "information"}
+    document = BookRecord.from_details(details).to_document()
+
+    assert document["information"] == {}
+    assert "upc" not in document and "price" not in document
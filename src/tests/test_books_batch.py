@@ -0,0 +1,113 @@
+from bson import ObjectId
+
+from database import db
+
+MEDITATIONS = {
+    "_id": ObjectId("65a000000000000000000001"),
+    "upc": "4f19709e47883df5",
+    "title": "Meditations",
+    "price": 25.89,
+}
+SAPIENS = {
+    "_id": ObjectId("65a000000000000000000002"),
+    "upc": "4165285e1663650f",
+    "title": "Sapiens",
+    "price": 54.23,
+}
+
+
+class FakeBooks:
+    """Answers the single `$or` of `$in` clauses issued by `get_books_by_ids`"""
+
+    def __init__(self, docs: list[dict]):
+        self.docs = docs
+        self.queries = []
+
+    def find(self, query: dict, projection=None):
+        self.queries.append((query, projection))
+        for doc in self.docs:
+            if any(
+                doc.get(field) in condition["$in"]
+                for clause in query["$or"]
+                for field, condition in clause.items()
+            ):
+                if projection is None:
+                    yield dict(doc)
+                else:
+                    yield {key: doc[key] for key in projection if key in doc}
+
+
+def test_ids_are_classified_and_returned_in_request_order(monkeypatch):
+    """Test ObjectIds, UPCs, unknown and invalid ids each get their status"""
+    books = FakeBooks([MEDITATIONS, SAPIENS])
+    monkeypatch.setattr(db, "books_collection", books)
+    ids = [
+        SAPIENS["upc"],
+        "not-an-id",
+        str(MEDITATIONS["_id"]),
+        "65a0000000000000000000ff",
+        "0000000000000000",
+        "4f19709e47883df",
+    ]
+
+    results = db.get_books_by_ids(ids)
+
+    assert [(result["id"], result["status"]) for result in results] == [
+        (SAPIENS["upc"], "found"),
+        ("not-an-id", "invalid"),
+        (str(MEDITATIONS["_id"]), "found"),
+        ("65a0000000000000000000ff", "not_found"),
+        ("0000000000000000", "not_found"),
+        ("4f19709e47883df", "invalid"),
+    ]
+    assert results[0]["book"]["title"] == "Sapiens"
+    assert results[2]["book"]["_id"] == str(MEDITATIONS["_id"])
+    assert results[1]["book"] is None and results[3]["book"] is None
+    assert len(books.queries) == 1
+
+
+def test_duplicate_ids_are_looked_up_once(monkeypatch):
+    """Test a book requested twice, and by both ids, is returned each time"""
+    books = FakeBooks([MEDITATIONS])
+    monkeypatch.setattr(db, "books_collection", books)
+    object_id = str(MEDITATIONS["_id"])
+
+    results = db.get_books_by_ids([object_id, MEDITATIONS["upc"], object_id])
+
+    assert [result["status"] for result in results] == ["found"] * 3
+    assert {result["book"]["_id"] for result in results} == {object_id}
+    ((query, _),) = books.queries
+    assert query["$or"] == [
+        {"_id": {"$in": [MEDITATIONS["_id"]]}},
+        {"upc": {"$in": [MEDITATIONS["upc"]]}},
+    ]
+
+
+def test_projection_keeps_the_fields_ids_are_matched_on(monkeypatch):
+    """Test `_id` and `upc` are always fetched so results can be matched"""
+    books = FakeBooks([MEDITATIONS, SAPIENS])
+    monkeypatch.setattr(db, "books_collection", books)
+
+    results = db.get_books_by_ids(
+        [str(MEDITATIONS["_id"]), SAPIENS["upc"]], projection={"title": 1}
+    )
+
+    assert [result["status"] for result in results] == ["found", "found"]
+    assert results[1]["book"] == {
+        "_id": str(SAPIENS["_id"]),
+        "upc": SAPIENS["upc"],
+        "title": "Sapiens",
+    }
+    _, projection = books.queries[0]
+    assert projection == {"title": 1, "_id": 1, "upc": 1}
+
+
+def test_only_invalid_ids_skip_the_query(monkeypatch):
+    """Test no query is sent when no id can match a book"""
+    books = FakeBooks([MEDITATIONS])
+    monkeypatch.setattr(db, "books_collection", books)
+
+    results = db.get_books_by_ids(["nope", ""])
+
+    assert [result["status"] for result in results] == ["invalid", "invalid"]
+    assert books.queries == []
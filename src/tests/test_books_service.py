@@ -49,8 +49,8 @@ def mock_html():
     return BeautifulSoup(html_str, "html.parser")
 
 
-@patch("utils.helpers.parse_ratings")
-@patch("utils.helpers.parse_book_id_html")
+@patch("src.utils.tag_parsers.parse_ratings")
+@patch("api.services.books_service.parse_book_id_html")
 def test_get_book_details(mock_parse_book_id_html, mock_parse_ratings, mock_html):
     """Test get_book_details returns correct structure and values"""
     # Setup mocks - order matters! Last patch decorator is first parameter
@@ -69,10 +69,13 @@ def test_get_book_details(mock_parse_book_id_html, mock_parse_ratings, mock_html
     assert result["ratings"] == EXPECTED_DATA["ratings"]
     assert result["description"] == EXPECTED_DATA["description"]
     assert result["information"] == EXPECTED_DATA["information"]
+    assert result["url"] == (
+        "https://books.toscrape.com/catalogue/meditations_33/index.html"
+    )
 
 
-@patch("utils.helpers.parse_ratings")
-@patch("utils.helpers.parse_book_id_html")
+@patch("src.utils.tag_parsers.parse_ratings")
+@patch("api.services.books_service.parse_book_id_html")
 def test_get_book_details_structure(
     mock_parse_book_id_html, mock_parse_ratings, mock_html
 ):
@@ -91,12 +94,13 @@ def test_get_book_details_structure(
         "ratings",
         "description",
         "information",
+        "url",
     }
     assert set(result.keys()) == required_keys
 
 
-@patch("utils.helpers.parse_ratings")
-@patch("utils.helpers.parse_book_id_html")
+@patch("src.utils.tag_parsers.parse_ratings")
+@patch("api.services.books_service.parse_book_id_html")
 def test_get_book_details_price_formatting(
     mock_parse_book_id_html, mock_parse_ratings, mock_html
 ):
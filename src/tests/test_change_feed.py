@@ -0,0 +1,305 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import AutoReconnect
+
+from api.services import change_feed
+from database import db
+from database.db import (
+    decode_change_cursor,
+    encode_change_cursor,
+    serialize_change,
+    timestamp_cursor,
+)
+
+TIMESTAMP = datetime(2025, 3, 1, 12, 30, 15, 123000)
+
+
+def make_change(timestamp: datetime, object_id: str) -> dict:
+    return {
+        "_id": ObjectId(object_id),
+        "book_id": "65a000000000000000000001",
+        "book_title": "Meditations",
+        "category": "Philosophy",
+        "change_type": "price_change",
+        "old_value": 25.89,
+        "new_value": 19.99,
+        "timestamp": timestamp,
+    }
+
+
+class FakeCursor(list):
+    def sort(self, keys):
+        return FakeCursor(sorted(self, key=lambda doc: [doc[key] for key, _ in keys]))
+
+    def limit(self, limit):
+        return FakeCursor(self[:limit])
+
+    def batch_size(self, size):
+        return self
+
+    def close(self):
+        pass
+
+
+class FakeChanges:
+    """Evaluates the feed's `$or` cursor query against in-memory documents"""
+
+    def __init__(self, docs: list[dict]):
+        self.docs = docs
+
+    def find(self, query: dict):
+        def matches(doc):
+            for clause in query["$or"]:
+                if "_id" in clause:
+                    if (
+                        doc["timestamp"] == clause["timestamp"]
+                        and doc["_id"] > clause["_id"]["$gt"]
+                    ):
+                        return True
+                elif doc["timestamp"] > clause["timestamp"]["$gt"]:
+                    return True
+            return False
+
+        return FakeCursor(dict(doc) for doc in self.docs if matches(doc))
+
+
+def test_cursor_round_trip():
+    """Test a cursor decodes to the change's millisecond timestamp and id"""
+    change = make_change(TIMESTAMP, "65a000000000000000000010")
+
+    cursor = encode_change_cursor(change)
+
+    assert decode_change_cursor(cursor) == (TIMESTAMP, change["_id"])
+    assert serialize_change(change)["cursor"] == cursor
+
+
+def test_cursor_truncates_to_milliseconds():
+    """Test sub-millisecond precision, which MongoDB does not store, is dropped"""
+    change = make_change(TIMESTAMP.replace(microsecond=123999), "65a0" + "0" * 20)
+
+    timestamp, _ = decode_change_cursor(encode_change_cursor(change))
+
+    assert timestamp == TIMESTAMP
+
+
+@pytest.mark.parametrize(
+    "cursor", ["", "abc", "123", "123_nothex", "x_65a000000000000000000010"]
+)
+def test_malformed_cursors_are_rejected(cursor):
+    """Test malformed cursors raise ValueError"""
+    with pytest.raises(ValueError):
+        decode_change_cursor(cursor)
+
+
+def test_changes_since_breaks_timestamp_ties_by_id(monkeypatch):
+    """Test changes in the same millisecond are paged through without gaps"""
+    docs = [
+        make_change(TIMESTAMP, "65a000000000000000000001"),
+        make_change(TIMESTAMP, "65a000000000000000000002"),
+        make_change(TIMESTAMP, "65a000000000000000000003"),
+        make_change(TIMESTAMP.replace(second=16), "65a000000000000000000000"),
+    ]
+    monkeypatch.setattr(db, "changes_collection", FakeChanges(docs))
+
+    first = db.get_changes_since(encode_change_cursor(docs[0]), limit=1)
+    second = db.get_changes_since(first["next_cursor"], limit=10)
+    last = db.get_changes_since(second["next_cursor"], limit=10)
+
+    assert [change["_id"] for change in first["changes"]] == [str(docs[1]["_id"])]
+    assert [change["_id"] for change in second["changes"]] == [
+        str(docs[2]["_id"]),
+        str(docs[3]["_id"]),
+    ]
+    assert last == {"changes": [], "next_cursor": second["next_cursor"]}
+
+
+def test_timestamp_cursor_skips_changes_up_to_the_timestamp(monkeypatch):
+    """Test a timestamp cursor excludes every change logged at that millisecond"""
+    docs = [
+        make_change(TIMESTAMP, "ffffffffffffffffffffff00"),
+        make_change(TIMESTAMP.replace(microsecond=124000), "65a000000000000000000001"),
+    ]
+    monkeypatch.setattr(db, "changes_collection", FakeChanges(docs))
+
+    result = db.get_changes_since(timestamp_cursor(TIMESTAMP))
+
+    assert [change["_id"] for change in result["changes"]] == [str(docs[1]["_id"])]
+
+
+@pytest.fixture
+def manila_time(monkeypatch):
+    """Run the test in a UTC+8 local timezone"""
+    monkeypatch.setenv("TZ", "Asia/Manila")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_timestamp_cursor_reads_offsets_in_local_time(manila_time):
+    """Test aware timestamps are converted to the local time changes are stored in"""
+    utc = datetime(2025, 3, 1, 4, 30, 15, 123000, tzinfo=timezone.utc)
+
+    assert timestamp_cursor(utc) == timestamp_cursor(TIMESTAMP)
+
+
+def test_export_resumes_from_a_feed_cursor(monkeypatch):
+    """Test the export accepts the same cursors as the feed"""
+    docs = [
+        make_change(TIMESTAMP, "65a000000000000000000002"),
+        make_change(TIMESTAMP, "65a000000000000000000001"),
+        make_change(TIMESTAMP.replace(second=16), "65a000000000000000000000"),
+    ]
+    monkeypatch.setattr(db, "changes_collection", FakeChanges(docs))
+
+    exported = list(db.iter_changes(since=encode_change_cursor(docs[1])))
+
+    assert [change["_id"] for change in exported] == [
+        str(docs[0]["_id"]),
+        str(docs[2]["_id"]),
+    ]
+
+
+class FakeBroadcaster:
+    def __init__(self, events: list):
+        self.queue: asyncio.Queue = asyncio.Queue()
+        for event in events:
+            self.queue.put_nowait(event)
+        self.unsubscribed = False
+
+    def subscribe(self):
+        return self.queue
+
+    def unsubscribe(self, queue):
+        self.unsubscribed = True
+
+
+def event_ids(stream) -> list[str]:
+    async def collect():
+        return [event async for event in stream]
+
+    return [
+        json.loads(event.split("data: ", 1)[1])["_id"]
+        for event in asyncio.run(collect())
+    ]
+
+
+def test_stream_skips_live_events_covered_by_the_replay(monkeypatch):
+    """Test changes logged during the replay are sent once, and in order"""
+    old = make_change(TIMESTAMP, "65a000000000000000000001")
+    replayed = [
+        make_change(TIMESTAMP, "65a000000000000000000002"),
+        make_change(TIMESTAMP.replace(second=16), "65a000000000000000000003"),
+    ]
+    live = make_change(TIMESTAMP.replace(second=17), "65a000000000000000000004")
+    other_type = make_change(TIMESTAMP.replace(second=18), "6" * 24)
+    other_type["change_type"] = "new_book"
+
+    # Published while the replay was reading them from the database
+    broadcaster = FakeBroadcaster(
+        [
+            serialize_change(old),
+            serialize_change(replayed[1]),
+            serialize_change(live),
+            serialize_change(other_type),
+            None,
+        ]
+    )
+    monkeypatch.setattr(change_feed, "broadcaster", broadcaster)
+
+    def fake_changes_since(cursor, limit, change_type):
+        assert cursor == encode_change_cursor(old)
+        return {
+            "changes": [{**change, "_id": str(change["_id"])} for change in replayed],
+            "next_cursor": encode_change_cursor(replayed[-1]),
+        }
+
+    monkeypatch.setattr(change_feed, "get_changes_since", fake_changes_since)
+
+    ids = event_ids(
+        change_feed.stream_changes(
+            since=encode_change_cursor(old), change_type="price_change"
+        )
+    )
+
+    assert ids == [str(replayed[0]["_id"]), str(replayed[1]["_id"]), str(live["_id"])]
+    assert broadcaster.unsubscribed
+
+
+def test_stream_without_since_sends_every_live_event(monkeypatch):
+    """Test a fresh subscriber gets live events without a replay"""
+    changes = [
+        make_change(TIMESTAMP, "65a000000000000000000002"),
+        make_change(TIMESTAMP, "65a000000000000000000001"),
+    ]
+    broadcaster = FakeBroadcaster([*map(serialize_change, changes), None])
+    monkeypatch.setattr(change_feed, "broadcaster", broadcaster)
+
+    ids = event_ids(change_feed.stream_changes())
+
+    assert ids == [str(change["_id"]) for change in changes]
+
+
+def test_listener_stops_after_the_last_subscriber(monkeypatch):
+    """Test the database is no longer polled once every stream has ended"""
+    polls = []
+
+    def changes_since(cursor, limit):
+        polls.append(cursor)
+        return {"changes": [], "next_cursor": cursor}
+
+    monkeypatch.setattr(change_feed, "POLL_INTERVAL", 0)
+    monkeypatch.setattr(change_feed, "get_latest_change_cursor", lambda: None)
+    monkeypatch.setattr(change_feed, "get_changes_since", changes_since)
+
+    async def subscribe_and_leave():
+        feed = change_feed.ChangeBroadcaster()
+        first, second = feed.subscribe(), feed.subscribe()
+        listener = feed._listener
+
+        feed.unsubscribe(first)
+        await asyncio.sleep(0.01)
+        running = not listener.done()
+        feed.unsubscribe(second)
+        await asyncio.sleep(0)
+        return running, listener, feed._listener
+
+    running, listener, current = asyncio.run(subscribe_and_leave())
+
+    assert running and polls
+    assert listener.cancelled() and current is None
+
+
+def test_polling_survives_database_errors(monkeypatch):
+    """Test a failed poll is retried instead of ending the feed"""
+    change = make_change(TIMESTAMP, "65a000000000000000000001")
+    attempts = []
+
+    def flaky_latest_cursor():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise AutoReconnect("primary stepped down")
+        return encode_change_cursor(change)
+
+    def changes_since(cursor, limit):
+        return {"changes": [change], "next_cursor": encode_change_cursor(change)}
+
+    monkeypatch.setattr(change_feed, "POLL_INTERVAL", 0)
+    monkeypatch.setattr(change_feed, "get_latest_change_cursor", flaky_latest_cursor)
+    monkeypatch.setattr(change_feed, "get_changes_since", changes_since)
+
+    async def first_event():
+        feed = change_feed.ChangeBroadcaster()
+        queue = feed.subscribe()
+        try:
+            return await asyncio.wait_for(queue.get(), 1)
+        finally:
+            await feed.close()
+
+    assert asyncio.run(first_event())["_id"] == str(change["_id"])
+    assert len(attempts) == 2
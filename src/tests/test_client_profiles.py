@@ -0,0 +1,120 @@
+import pytest
+from pymongo.write_concern import WriteConcern
+
+from database import db
+from database.db import ClientProfile, load_profiles
+
+SETTINGS = [
+    "MONGO_API_POOL_SIZE",
+    "MONGO_API_READ_PREFERENCE",
+    "MONGO_API_MAX_STALENESS_SECONDS",
+    "MONGO_API_WRITE_CONCERN",
+    "MONGO_INGEST_POOL_SIZE",
+    "MONGO_INGEST_WRITE_CONCERN",
+    "MONGO_INGEST_JOURNAL",
+]
+
+
+@pytest.fixture(autouse=True)
+def clean_environment(monkeypatch):
+    for name in SETTINGS:
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_default_profiles():
+    """Test API reads go to secondaries and ingest writes wait for the primary"""
+    profiles = load_profiles()
+
+    assert profiles["api"].client_options() == {
+        "maxPoolSize": 100,
+        "readPreference": "secondaryPreferred",
+        "maxStalenessSeconds": 90,
+    }
+    assert profiles["ingest"].client_options() == {
+        "maxPoolSize": 10,
+        "readPreference": "primary",
+        "w": 1,
+        "journal": False,
+    }
+
+
+def test_profiles_from_settings(monkeypatch):
+    """Test every setting reaches the client options"""
+    monkeypatch.setenv("MONGO_API_POOL_SIZE", "200")
+    monkeypatch.setenv("MONGO_API_READ_PREFERENCE", "nearest")
+    monkeypatch.setenv("MONGO_API_MAX_STALENESS_SECONDS", "120")
+    monkeypatch.setenv("MONGO_API_WRITE_CONCERN", "majority")
+    monkeypatch.setenv("MONGO_INGEST_POOL_SIZE", "4")
+    monkeypatch.setenv("MONGO_INGEST_WRITE_CONCERN", "2")
+    monkeypatch.setenv("MONGO_INGEST_JOURNAL", "TRUE")
+
+    profiles = load_profiles()
+
+    assert profiles["api"].client_options() == {
+        "maxPoolSize": 200,
+        "readPreference": "nearest",
+        "maxStalenessSeconds": 120,
+        "w": "majority",
+    }
+    assert profiles["ingest"].client_options() == {
+        "maxPoolSize": 4,
+        "readPreference": "primary",
+        "w": 2,
+        "journal": True,
+    }
+
+
+def test_staleness_is_ignored_for_primary_reads():
+    """Test maxStalenessSeconds is only sent with a secondary read preference"""
+    profile = ClientProfile(read_preference="primary", max_staleness_seconds=90)
+
+    assert "maxStalenessSeconds" not in profile.client_options()
+
+
+@pytest.mark.parametrize(
+    "setting", ["MONGO_API_WRITE_CONCERN", "MONGO_INGEST_WRITE_CONCERN"]
+)
+def test_unacknowledged_writes_are_rejected(monkeypatch, setting):
+    """Test w=0 is refused, since change tracking needs write results"""
+    monkeypatch.setenv(setting, "0")
+
+    with pytest.raises(ValueError, match="w=0"):
+        load_profiles()
+
+
+@pytest.mark.parametrize(
+    "setting, value",
+    [("MONGO_API_POOL_SIZE", "many"), ("MONGO_API_MAX_STALENESS_SECONDS", "1.5")],
+)
+def test_invalid_numbers_are_rejected(monkeypatch, setting, value):
+    """Test malformed numeric settings fail at startup"""
+    monkeypatch.setenv(setting, value)
+
+    with pytest.raises(ValueError):
+        load_profiles()
+
+
+class FakeCrawlRuns:
+    def __init__(self):
+        self.write_concern = None
+        self.documents = []
+
+    def with_options(self, write_concern):
+        self.write_concern = write_concern
+        return self
+
+    def insert_one(self, document):
+        self.documents.append(document)
+
+
+def test_crawl_runs_are_recorded_with_majority_journaled_writes(monkeypatch):
+    """Test the end-of-crawl checkpoint waits for a journaled majority"""
+    runs = FakeCrawlRuns()
+    monkeypatch.setattr(db, "crawl_runs_collection", runs)
+
+    db.record_crawl_run({"status": "success", "total_books": 1000})
+
+    assert runs.write_concern == WriteConcern("majority", j=True)
+    (document,) = runs.documents
+    assert document["total_books"] == 1000
+    assert "recorded_at" in document
@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from database.models import BookRecord
+from src.api.routes import covers as cover_routes
+from src.crawler import covers
+from src.crawler.covers import CoverPipeline, cover_path, image_type, store_cover
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 16
+DIGEST = "0" * 64
+
+
+@pytest.fixture(autouse=True)
+def covers_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(covers, "COVERS_DIR", str(tmp_path))
+    return tmp_path
+
+
+def png_image() -> bytes:
+    Image = pytest.importorskip("PIL.Image")
+    buffer = io.BytesIO()
+    Image.new("RGB", (300, 450), "red").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_covers_are_stored_once_under_their_hash():
+    """Test identical covers share one file and distinct covers get their own"""
+    digest = store_cover(PNG)
+    mtime = os.stat(cover_path(digest)).st_mtime_ns
+
+    assert store_cover(PNG) == digest == hashlib.sha256(PNG).hexdigest()
+    assert os.stat(cover_path(digest)).st_mtime_ns == mtime
+    assert store_cover(PNG + b"!") != digest
+    assert cover_path(digest).endswith(os.path.join(digest[:2], f"{digest}.jpg"))
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (b"\xff\xd8\xff\xe0\x00\x10JFIF", "image/jpeg"),
+        (PNG, "image/png"),
+        (b"GIF89a\x01\x00", "image/gif"),
+        (b"RIFF\x00\x00\x00\x00WEBPVP8 ", "image/webp"),
+        (b"<html>", "application/octet-stream"),
+    ],
+)
+def test_image_type(header, expected):
+    """Test image formats are recognised from their signatures"""
+    assert image_type(header) == expected
+
+
+def get_cover(digest: str, size: str = "original"):
+    return asyncio.run(cover_routes.get_cover(digest=digest, size=size))
+
+
+def test_cover_route_sends_the_stored_format():
+    """Test a PNG cover is served as image/png with immutable caching"""
+    digest = store_cover(PNG)
+
+    response = get_cover(digest)
+
+    assert response.media_type == "image/png"
+    assert response.headers["ETag"] == f'"{digest}-original"'
+    assert "immutable" in response.headers["Cache-Control"]
+
+
+@pytest.mark.parametrize("digest", [DIGEST, "not-a-digest", "../" + DIGEST[3:]])
+def test_cover_route_unknown_covers(digest):
+    """Test missing covers and malformed digests are 404s"""
+    with pytest.raises(HTTPException) as error:
+        get_cover(digest)
+    assert error.value.status_code == 404
+
+
+def process(book: BookRecord, content: bytes):
+    """Run the pipeline's store and thumbnail steps on `content`"""
+
+    async def fetch(book, previous):
+        return store_cover(content)
+
+    async def run():
+        pipeline = CoverPipeline(None, asyncio.Semaphore(1), workers=1)
+        pipeline._fetch = fetch
+        try:
+            await pipeline._process_book(book, None)
+        finally:
+            pipeline.close()
+
+    asyncio.run(run())
+
+
+def make_book() -> BookRecord:
+    return BookRecord(
+        title="Meditations",
+        url=None,
+        cover="https://books.toscrape.com/media/cache/meditations.png",
+        category="Philosophy",
+        ratings=2,
+        description=None,
+    )
+
+
+def test_thumbnails_are_jpeg():
+    """Test a PNG cover gets a downsized JPEG thumbnail, served as such"""
+    book = make_book()
+
+    process(book, png_image())
+
+    assert book.thumbnail_path == cover_path(book.cover_hash, thumbnail=True)
+    assert get_cover(book.cover_hash).media_type == "image/png"
+    assert get_cover(book.cover_hash, "thumbnail").media_type == "image/jpeg"
+
+
+def test_unreadable_cover_keeps_original_without_thumbnail():
+    """Test a cover Pillow cannot read is stored but gets no thumbnail"""
+    pytest.importorskip("PIL")
+    book = make_book()
+
+    process(book, b"<html>Not Found</html>")
+
+    assert book.cover_hash == hashlib.sha256(b"<html>Not Found</html>").hexdigest()
+    assert book.thumbnail_path is None
+    assert not os.path.exists(cover_path(book.cover_hash, thumbnail=True))
+
+
+def test_thumbnail_errors_are_specific(tmp_path):
+    """Test unreadable images raise ThumbnailError rather than Pillow's errors"""
+    pytest.importorskip("PIL")
+    source = tmp_path / "cover.jpg"
+    source.write_bytes(b"not an image")
+
+    with pytest.raises(covers.ThumbnailError):
+        covers.make_thumbnail(str(source), str(tmp_path / "thumb.jpg"), 150)
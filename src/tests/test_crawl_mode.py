@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from crawler import crawler
+from crawler.crawler import ListingPage
+from database.models import BookRecord
+
+ROOT_URL = "https://books.toscrape.com/index.html"
+
+
+def make_book(category: str) -> BookRecord:
+    return BookRecord(
+        title=f"A {category} book",
+        url=None,
+        cover=None,
+        category=category,
+        ratings=None,
+        description=None,
+    )
+
+
+@pytest.fixture
+def site(monkeypatch):
+    """
+    A site with `categories` categories of `books` each, whose catalogue-wide
+    listing has `page_count` pages; records which listings were crawled
+    """
+    layout = {"categories": 50, "books": 20, "page_count": 51, "index": True}
+    crawled = []
+
+    async def fake_fetch_index(session, semaphore, root_url):
+        categories = {
+            f"Category {i}": f"{root_url}category/{i}"
+            for i in range(layout["categories"])
+        }
+        index = None
+        if layout["index"]:
+            index = ListingPage(
+                ["#book"] * crawler.BOOKS_PER_PAGE, None, layout["page_count"]
+            )
+        return categories, index
+
+    async def fake_scrape_listing(session, url, semaphore, *args, **kwargs):
+        crawled.append(url)
+        return [
+            make_book(f"Category {i}")
+            for i in range(layout["categories"])
+            for _ in range(layout["books"])
+        ]
+
+    async def fake_scrape_category(session, url, semaphore, *args):
+        crawled.append(url)
+        category = "Category " + url.rsplit("/", 1)[1]
+        return [make_book(category) for _ in range(layout["books"])]
+
+    monkeypatch.setattr(crawler, "fetch_index", fake_fetch_index)
+    monkeypatch.setattr(crawler, "scrape_listing", fake_scrape_listing)
+    monkeypatch.setattr(crawler, "scrape_category", fake_scrape_category)
+    return layout, crawled
+
+
+def crawl(mode: str = "auto", **kwargs) -> dict:
+    kwargs.setdefault("save_func", lambda books: {})
+    return asyncio.run(crawler.scrape_website(root_url=ROOT_URL, mode=mode, **kwargs))
+
+
+@pytest.mark.parametrize("page_count, mode", [(51, "sweep"), (52, "category")])
+def test_auto_assumes_one_page_per_category_without_counts(site, page_count, mode):
+    """Test auto sweeps when the sweep needs at most one page per category"""
+    layout, crawled = site
+    layout["page_count"] = page_count
+
+    stats = crawl()
+
+    assert stats["mode"] == mode
+    assert len(crawled) == (1 if mode == "sweep" else 50)
+
+
+@pytest.mark.parametrize("page_count, mode", [(8, "sweep"), (9, "category")])
+def test_auto_uses_category_sizes_from_the_previous_crawl(
+    mongo, site, page_count, mode
+):
+    """Test stored category sizes set the cost of a category crawl"""
+    layout, _ = site
+    layout.update(categories=3, page_count=page_count)
+    # 5 pages for the first category and a landing page for each of the others
+    mongo.books.insert_many(
+        [{"upc": f"{i:016x}", "category": "Category 0"} for i in range(100)]
+    )
+
+    stats = crawl(save_func=None)
+
+    assert stats["mode"] == mode
+    assert mongo.crawl_runs.find_one()["mode"] == mode
+
+
+@pytest.mark.parametrize("home_page", ["without_page_count", "unreachable"])
+def test_auto_without_a_page_count_crawls_categories(site, home_page):
+    """Test a home page without "Page 1 of N", or unreachable, means categories"""
+    layout, _ = site
+    if home_page == "unreachable":
+        layout["index"] = False
+    else:
+        layout["page_count"] = None
+
+    stats = crawl()
+
+    assert stats["mode"] == "category"
+    assert "listing_requests" not in stats
+
+
+def test_listing_requests_saved_is_never_negative(site):
+    """Test a forced mode costing more than the other reports nothing saved"""
+    layout, _ = site
+    layout["page_count"] = 11
+
+    category = crawl("category")
+    sweep = crawl("sweep")
+
+    assert category["listing_requests"] == 50
+    assert category["listing_requests_saved"] == 0
+    assert sweep["listing_requests"] == 10
+    assert sweep["listing_requests_saved"] == 40
@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import mongomock
+import pytest
+
+from api.services.export_service import (
+    BOOK_COLUMNS,
+    export_projection,
+    flatten,
+    stream_export,
+)
+
+BOOK = {
+    "upc": "4f19709e47883df5",
+    "title": "Meditations",
+    "category": "Philosophy",
+    "ratings": 2,
+    "price": 25.89,
+    "url": "https://books.toscrape.com/catalogue/meditations_33/index.html",
+    "cover": "https://books.toscrape.com/media/cache/meditations.jpg",
+    "description": "Written in Greek by the only Roman emperor...",
+    "scraped_at": datetime(2025, 3, 1, 12, 30, 15),
+    "information": {
+        "UPC": "4f19709e47883df5",
+        "Product Type": "Books",
+        "Price (excl. tax)": "£25.89",
+        "Price (incl. tax)": "£25.89",
+        "Tax": "£0.00",
+        "Availability": "In stock (1 available)",
+        "Number of reviews": "0",
+    },
+}
+
+
+@pytest.fixture
+def exported_books():
+    """The seeded book as the export endpoint reads it from MongoDB"""
+    books = mongomock.MongoClient().bookscrapper.books
+    books.insert_one(dict(BOOK))
+
+    docs = list(books.find({}, export_projection(BOOK_COLUMNS)))
+    for doc in docs:
+        doc["_id"] = str(doc["_id"])
+    return docs
+
+
+def export(docs: list[dict], export_format: str) -> bytes:
+    return b"".join(stream_export(docs, export_format, BOOK_COLUMNS))
+
+
+def test_projection_uses_top_level_fields():
+    """Test dotted column names are not sent to MongoDB as nested paths"""
+    projection = export_projection(BOOK_COLUMNS)
+
+    assert projection["information"] == 1
+    assert all("." not in field for field in projection)
+
+
+def test_ndjson_export_fills_every_column(exported_books):
+    """Test every column is present in the NDJSON export of a full book"""
+    (line,) = export(exported_books, "ndjson").decode("utf-8").splitlines()
+    row = flatten(json.loads(line))
+
+    assert {name for name, _ in BOOK_COLUMNS} <= row.keys()
+    assert all(row[name] not in (None, "") for name, _ in BOOK_COLUMNS)
+
+
+def test_csv_export_fills_every_column(exported_books):
+    """Test every CSV column has a value for a full book"""
+    reader = csv.DictReader(io.StringIO(export(exported_books, "csv").decode()))
+    (row,) = list(reader)
+
+    assert reader.fieldnames == [name for name, _ in BOOK_COLUMNS]
+    assert all(row[name] for name, _ in BOOK_COLUMNS)
+    assert row["information.Price (excl. tax)"] == "£25.89"
+
+
+def test_parquet_export_fills_every_column(exported_books):
+    """Test every Parquet column has a value for a full book"""
+    pq = pytest.importorskip("pyarrow.parquet")
+    table = pq.read_table(io.BytesIO(export(exported_books, "parquet")))
+    (row,) = table.to_pylist()
+
+    assert table.column_names == [name for name, _ in BOOK_COLUMNS]
+    assert all(row[name] is not None for name, _ in BOOK_COLUMNS)
+    assert row["information.Price (incl. tax)"] == "£25.89"
+    assert row["price"] == 25.89
@@ -0,0 +1,62 @@
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
+
+from src.api import auth
+from src.api.app import app
+
+
+@pytest.fixture
+def client():
+    # Not used as a context manager, so the MongoDB lifespan does not run
+    return TestClient(app)
+
+
+def request_counts(client: TestClient) -> dict[tuple[str, str, str], float]:
+    """Observations of api_request_seconds by (method, endpoint, status)"""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+
+    counts = {}
+    for family in text_string_to_metric_families(response.text):
+        if family.name == "api_request_seconds":
+            for sample in family.samples:
+                if sample.name == "api_request_seconds_count":
+                    labels = sample.labels
+                    key = (labels["method"], labels["endpoint"], labels["status"])
+                    counts[key] = sample.value
+    return counts
+
+
+def test_requests_are_labelled_by_route_name(client):
+    """Test latency is recorded per endpoint name, not per raw path"""
+    before = request_counts(client)
+
+    client.get("/health")
+    for digest in ["a" * 64, "b" * 64]:
+        assert client.get(f"/covers/{digest}").status_code == 404
+    client.get("/no/such/page")
+
+    after = request_counts(client)
+
+    def observed(key):
+        return after.get(key, 0) - before.get(key, 0)
+
+    assert observed(("GET", "health_check", "200")) == 1
+    assert observed(("GET", "get_cover", "404")) == 2
+    assert observed(("GET", "unmatched", "404")) == 1
+    assert not any("/covers/" in endpoint for _, endpoint, _ in after)
+
+
+def test_metrics_require_the_token_when_set(client, monkeypatch):
+    """Test METRICS_TOKEN gates scrapes behind a bearer token"""
+    monkeypatch.setattr(auth, "METRICS_TOKEN", "s3cret")
+
+    missing = client.get("/metrics")
+    wrong = client.get("/metrics", headers={"Authorization": "Bearer nope"})
+    valid = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+
+    assert missing.status_code == wrong.status_code == 401
+    assert missing.headers["WWW-Authenticate"] == "Bearer"
+    assert valid.status_code == 200
+    assert "api_request_seconds" in valid.text
@@ -0,0 +1,166 @@
+import asyncio
+
+import pytest
+from bs4 import BeautifulSoup
+
+from crawler import crawler
+from crawler.crawler import ListingPage, listing_page_url, parse_listing_page
+from database.models import BookRecord
+from utils.tag_parsers import parse_page_count
+
+CATEGORY_URL = "https://books.toscrape.com/catalogue/category/books/travel_2/index.html"
+
+
+def listing_html(current: str = "", next_href: str = "") -> str:
+    pager = f'<li class="current">{current}</li>' if current else ""
+    if next_href:
+        pager += f'<li class="next"><a href="{next_href}">next</a></li>'
+    books = "".join(
+        f'<article class="product_pod"><h3><a href="{href}">x</a></h3></article>'
+        for href in ["../../../a_1/index.html", "../../../b_2/index.html"]
+    )
+    return f'<html><body>{books}<ul class="pager">{pager}</ul></body></html>'
+
+
+@pytest.mark.parametrize(
+    "current, expected",
+    [
+        ("Page 1 of 8", 8),
+        ("\n            Page 1 of 50\n        ", 50),
+        ("Page 3 of 3", 3),
+        ("Page one of many", None),
+        ("", None),
+    ],
+)
+def test_parse_page_count(current, expected):
+    """Test the page count is read from the "Page 1 of N" pager"""
+    soup = BeautifulSoup(listing_html(current), "lxml")
+
+    assert parse_page_count(soup) == expected
+
+
+def test_parse_listing_page():
+    """Test book links and the next link are resolved against the page URL"""
+    soup = BeautifulSoup(listing_html("Page 1 of 2", "page-2.html"), "lxml")
+
+    page = parse_listing_page(soup, CATEGORY_URL)
+
+    assert page.book_links == [
+        "https://books.toscrape.com/catalogue/a_1/index.html",
+        "https://books.toscrape.com/catalogue/b_2/index.html",
+    ]
+    assert page.next_url == listing_page_url(CATEGORY_URL, 2)
+    assert page.page_count == 2
+
+
+def test_listing_page_url():
+    """Test page URLs are siblings of the first page"""
+    assert listing_page_url(CATEGORY_URL, 3) == (
+        "https://books.toscrape.com/catalogue/category/books/travel_2/page-3.html"
+    )
+
+
+@pytest.fixture
+def site(monkeypatch):
+    """Fake listing pages keyed by URL; records the order pages are fetched in"""
+    pages: dict[str, ListingPage] = {}
+    fetched: list[str] = []
+
+    async def fake_fetch_listing_page(session, url, semaphore):
+        fetched.append(url)
+        await asyncio.sleep(0)
+        return pages.get(url)
+
+    async def fake_fetch_book_details(session, url, semaphore):
+        return BookRecord(
+            title=url,
+            url=url,
+            cover=None,
+            category="Travel",
+            ratings=None,
+            description=None,
+        )
+
+    monkeypatch.setattr(crawler, "fetch_listing_page", fake_fetch_listing_page)
+    monkeypatch.setattr(crawler, "fetch_book_details", fake_fetch_book_details)
+    return pages, fetched
+
+
+def scrape(url: str = CATEGORY_URL, **kwargs) -> list[str]:
+    books = asyncio.run(
+        crawler.scrape_listing(None, url, asyncio.Semaphore(10), **kwargs)
+    )
+    return [book.title for book in books]
+
+
+def make_pages(pages: dict, count: int, page_count, next_url=listing_page_url):
+    """Register `count` pages of one book each, chained through next links"""
+    urls = [CATEGORY_URL] + [listing_page_url(CATEGORY_URL, k) for k in range(2, 5)]
+    for k in range(count):
+        next_page = next_url(CATEGORY_URL, k + 2) if k + 1 < count else None
+        pages[urls[k]] = ListingPage(
+            [f"{urls[k]}#book"], next_page, page_count if k == 0 else None
+        )
+    return urls[:count]
+
+
+def test_page_count_fetches_remaining_pages_concurrently(site):
+    """Test every page is requested up front instead of through next links"""
+    pages, fetched = site
+    urls = make_pages(pages, 4, page_count=4)
+    # Later pages carry no next links, so only the page count can reach them
+    for url in urls[1:]:
+        pages[url].next_url = None
+
+    titles = scrape()
+
+    assert fetched == urls
+    assert titles == [f"{url}#book" for url in urls]
+
+
+def test_unexpected_page_scheme_falls_back_to_next_links(site):
+    """Test pages are not guessed when the next link is not page-2.html"""
+    pages, fetched = site
+    urls = make_pages(pages, 3, page_count=3)
+    odd_url = CATEGORY_URL.replace("index.html", "index.html?page=2")
+    pages[odd_url] = pages.pop(urls[1])
+    pages[CATEGORY_URL].next_url = odd_url
+
+    titles = scrape()
+
+    assert fetched == [CATEGORY_URL, odd_url, urls[2]]
+    assert len(titles) == 3
+
+
+def test_missing_page_count_falls_back_to_next_links(site):
+    """Test pages are followed one by one without a "Page 1 of N" pager"""
+    pages, fetched = site
+    urls = make_pages(pages, 3, page_count=None)
+
+    titles = scrape()
+
+    assert fetched == urls
+    assert titles == [f"{url}#book" for url in urls]
+
+
+def test_prefetched_first_page_uses_pages_base(site):
+    """Test a sweep starting from the home page fetches catalogue/page-K.html"""
+    pages, fetched = site
+    root = "https://books.toscrape.com/index.html"
+    base = "https://books.toscrape.com/catalogue/"
+    first = ListingPage([f"{root}#book"], listing_page_url(base, 2), 3)
+    for k in (2, 3):
+        pages[listing_page_url(base, k)] = ListingPage([f"{k}#book"], None, None)
+
+    titles = scrape(root, first=first, pages_base=base)
+
+    assert fetched == [listing_page_url(base, 2), listing_page_url(base, 3)]
+    assert titles == [f"{root}#book", "2#book", "3#book"]
+
+
+def test_unreachable_first_page(site):
+    """Test a listing whose first page cannot be fetched yields no books"""
+    _, fetched = site
+
+    assert scrape() == []
+    assert fetched == [CATEGORY_URL]
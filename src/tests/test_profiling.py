@@ -0,0 +1,122 @@
+import asyncio
+import os
+
+import pytest
+from fastapi import Request
+from fastapi.responses import Response
+
+from utils import profiling
+from utils.profiling import ProfileSettings, profile, profiled_crawl
+
+
+@pytest.fixture(autouse=True)
+def profile_settings(monkeypatch, tmp_path):
+    """Profiles written to a temporary directory, with an empty budget window"""
+    settings = ProfileSettings(directory=str(tmp_path), max_per_minute=2)
+    monkeypatch.setattr(profiling, "settings", settings)
+    monkeypatch.setattr(profiling, "_recent", profiling.deque())
+    return settings
+
+
+def test_profile_writes_to_the_profile_dir(tmp_path):
+    """Test a profiled block yields the path its profile is written to"""
+    with profile("request-GET-/books") as path:
+        sum(range(1000))
+
+    assert os.path.dirname(path) == str(tmp_path)
+    assert os.path.basename(path).startswith("request-GET-")
+    assert "/" not in os.path.relpath(path, tmp_path)
+    assert os.path.exists(path)
+
+
+def test_rate_limited_profiles_stop_at_the_budget():
+    """Test PROFILE_MAX_PER_MINUTE caps rate-limited profiles"""
+    paths = []
+    for _ in range(3):
+        with profile("request", rate_limited=True) as path:
+            paths.append(path)
+
+    assert [path is not None for path in paths] == [True, True, False]
+
+
+def test_busy_profiler_does_not_use_the_budget():
+    """Test a request skipped because a profile is running is not charged"""
+    with profile("crawl") as outer, profile("request", rate_limited=True) as inner:
+        pass
+
+    assert outer is not None and inner is None
+    assert len(profiling._recent) == 0
+
+
+@pytest.mark.parametrize(
+    "path, header, expected",
+    [
+        ("/books", "1", True),
+        ("/books", None, False),
+        ("/changes", "1", False),
+    ],
+)
+def test_requests_are_profiled_on_header_under_routes(
+    profile_settings, path, header, expected
+):
+    """Test PROFILE_HEADER and PROFILE_ROUTES select the requests to profile"""
+    profile_settings.header = True
+    profile_settings.routes = ("/books",)
+
+    assert profiling._should_profile_request(path, header) == expected
+
+
+def test_middleware_reports_the_profile_id(profile_settings):
+    """Test a profiled response names its profile in X-Profile-Id"""
+    profile_settings.header = True
+    request = Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/books",
+            "query_string": b"",
+            "headers": [(b"x-profile", b"1")],
+        }
+    )
+
+    async def call_next(request):
+        await asyncio.sleep(0)
+        return Response("{}")
+
+    response = asyncio.run(profiling.profile_requests(request, call_next))
+
+    profile_id = response.headers["X-Profile-Id"]
+    assert os.path.exists(os.path.join(profile_settings.directory, profile_id))
+
+
+def test_coroutine_crawls_are_profiled_in_async_mode(profile_settings, monkeypatch):
+    """Test crawl coroutines are profiled inside the event loop in async mode"""
+    profile_settings.crawls = True
+    backends = []
+    backend = profiling._backend
+
+    def recording_backend(async_mode):
+        backends.append(async_mode)
+        return backend(async_mode)
+
+    monkeypatch.setattr(profiling, "_backend", recording_backend)
+
+    @profiled_crawl
+    async def crawl(pages):
+        await asyncio.sleep(0)
+        return pages
+
+    assert asyncio.run(crawl(3)) == 3
+    assert backends == [True]
+    assert len(os.listdir(profile_settings.directory)) == 1
+
+
+def test_crawls_are_not_profiled_by_default(profile_settings):
+    """Test PROFILE_CRAWLS is off unless enabled"""
+
+    @profiled_crawl
+    async def crawl():
+        return "done"
+
+    assert asyncio.run(crawl()) == "done"
+    assert os.listdir(profile_settings.directory) == []
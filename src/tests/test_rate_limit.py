@@ -0,0 +1,201 @@
+import asyncio
+
+import fakeredis
+import pytest
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from redis.exceptions import ConnectionError
+
+from api import rate_limit
+from api.rate_limit import RateLimiter, add_rate_limit_headers, parse_rate
+
+
+def test_parse_rate():
+    """Test rate strings are parsed into (requests, seconds)"""
+    assert parse_rate("100/hour") == (100, 3600)
+    assert parse_rate("5/minute") == (5, 60)
+
+    with pytest.raises(ValueError):
+        parse_rate("100 per hour")
+
+
+def test_token_bucket_exhausts_and_blocks():
+    """Test requests beyond the bucket capacity are rejected with a retry-after"""
+    limiter = RateLimiter()
+
+    async def hit_many():
+        return [await limiter.hit("key", "3/minute") for _ in range(5)]
+
+    results = asyncio.run(hit_many())
+
+    assert [result.allowed for result in results] == [True, True, True, False, False]
+    assert [result.remaining for result in results[:3]] == [2, 1, 0]
+    assert results[3].retry_after == pytest.approx(20, abs=1)
+
+
+def test_token_bucket_is_per_key():
+    """Test one key exhausting its bucket does not affect another key"""
+    limiter = RateLimiter()
+
+    async def hit():
+        await limiter.hit("first", "1/hour")
+        return await limiter.hit("first", "1/hour"), await limiter.hit(
+            "second", "1/hour"
+        )
+
+    first, second = asyncio.run(hit())
+
+    assert not first.allowed
+    assert second.allowed
+
+
+def test_refilled_buckets_and_expired_blocks_are_swept(monkeypatch):
+    """Test per-process state for clients that stopped calling is dropped"""
+    clock = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: clock[0])
+    limiter = RateLimiter()
+
+    async def hit(identity):
+        return await limiter.hit(identity, "2/minute")
+
+    asyncio.run(hit("idle"))
+    for _ in range(3):
+        asyncio.run(hit("blocked"))
+    assert len(limiter._local_buckets) == 2
+    assert len(limiter._blocked_until) == 1
+
+    clock[0] += rate_limit.LOCAL_SWEEP_INTERVAL
+    result = asyncio.run(hit("active"))
+
+    assert result.allowed
+    assert len(limiter._local_buckets) == 1
+    assert limiter._blocked_until == {}
+
+
+def test_local_buckets_are_bounded(monkeypatch):
+    """Test the least recently used bucket is evicted beyond the bound"""
+    monkeypatch.setattr(rate_limit, "MAX_LOCAL_BUCKETS", 2)
+    limiter = RateLimiter()
+
+    async def hit_all():
+        for identity in ["first", "second", "first", "third"]:
+            await limiter.hit(identity, "5/minute")
+
+    asyncio.run(hit_all())
+
+    assert len(limiter._local_buckets) == 2
+    # "second" was used least recently; "first" has spent two tokens
+    remaining = [int(bucket[0]) for bucket in limiter._local_buckets.values()]
+    assert remaining == [3, 4]
+
+
+def test_headers_are_added_to_streaming_responses():
+    """Test X-RateLimit-* headers reach routes returning their own response"""
+    request = Request({"type": "http", "headers": []})
+    request.state.rate_limit_headers = {
+        "X-RateLimit-Limit": "100",
+        "X-RateLimit-Remaining": "99",
+    }
+
+    async def call_next(request):
+        return StreamingResponse(iter([b"{}\n"]), media_type="application/x-ndjson")
+
+    response = asyncio.run(add_rate_limit_headers(request, call_next))
+
+    assert response.headers["X-RateLimit-Limit"] == "100"
+    assert response.headers["X-RateLimit-Remaining"] == "99"
+
+
+@pytest.fixture
+def redis_limiter(monkeypatch):
+    """A limiter running the token bucket script on fakeredis"""
+    monkeypatch.setattr(rate_limit, "Redis", fakeredis.FakeAsyncRedis)
+    limiter = RateLimiter(redis_url="redis://localhost:6379")
+
+    # Counts the Redis round trips made by the limiter
+    calls = []
+    script = limiter._script
+
+    async def counted_script(keys, args):
+        calls.append(keys[0])
+        return await script(keys=keys, args=args)
+
+    limiter._script = counted_script
+    return limiter, calls
+
+
+def test_redis_bucket_exhausts_and_blocks(redis_limiter):
+    """Test the Lua token bucket rejects requests beyond its capacity"""
+    limiter, calls = redis_limiter
+
+    async def hit_many():
+        results = [await limiter.hit("key", "3/minute") for _ in range(4)]
+        ttl = await limiter._redis.pttl(calls[0])
+        return results, ttl
+
+    results, ttl = asyncio.run(hit_many())
+
+    assert [result.allowed for result in results] == [True, True, True, False]
+    assert [result.remaining for result in results] == [2, 1, 0, 0]
+    assert results[3].retry_after == pytest.approx(20, abs=1)
+    # The bucket expires once it would have refilled
+    assert 0 < ttl <= 60_000
+
+
+def test_redis_bucket_is_shared_between_workers(redis_limiter):
+    """Test limiters on the same Redis draw from one bucket per key"""
+    limiter, _ = redis_limiter
+    other_worker = RateLimiter(redis_url="redis://localhost:6379")
+
+    async def hit():
+        await limiter.hit("key", "2/hour")
+        await other_worker.hit("key", "2/hour")
+        return await limiter.hit("key", "2/hour"), await other_worker.hit(
+            "other", "2/hour"
+        )
+
+    limited, other_key = asyncio.run(hit())
+
+    assert not limited.allowed
+    assert other_key.allowed and other_key.remaining == 1
+
+
+def test_blocked_keys_skip_redis_until_retry_after(redis_limiter, monkeypatch):
+    """Test rejected keys are answered locally until their block expires"""
+    limiter, calls = redis_limiter
+    clock = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: clock[0])
+
+    async def hit():
+        return await limiter.hit("key", "1/hour")
+
+    async def run():
+        await hit()
+        rejected = await hit()
+        blocked = [await hit() for _ in range(3)]
+        clock[0] += rejected.retry_after
+        return rejected, blocked, await hit()
+
+    rejected, blocked, after_block = asyncio.run(run())
+
+    assert not rejected.allowed
+    assert not any(result.allowed for result in blocked)
+    assert blocked[-1].retry_after == pytest.approx(rejected.retry_after)
+    # Two hits reached Redis, the blocked ones did not, and the next one does
+    assert len(calls) == 3
+    assert not after_block.allowed
+
+
+def test_redis_errors_fail_open(redis_limiter):
+    """Test requests are allowed when Redis cannot be reached"""
+    limiter, _ = redis_limiter
+
+    async def unavailable(keys, args):
+        raise ConnectionError("Connection refused")
+
+    limiter._script = unavailable
+
+    result = asyncio.run(limiter.hit("key", "1/hour"))
+
+    assert result.allowed
+    assert limiter._blocked_until == {}
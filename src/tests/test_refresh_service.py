@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from api.services import refresh_service
+from api.services.refresh_service import BookNotFound, BookRefresher
+from database.models import BookRecord
+
+BOOK_ID = "65a000000000000000000001"
+BOOK_URL = "https://books.toscrape.com/catalogue/meditations_33/index.html"
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Fake the stored book, the source site and the database write"""
+    calls = {"fetch": 0, "save": 0}
+
+    async def fake_fetch(session, url, semaphore):
+        calls["fetch"] += 1
+        await asyncio.sleep(0.05)
+        return BookRecord(
+            title="Meditations",
+            url=url,
+            cover=None,
+            category="Philosophy",
+            ratings=2,
+            description=None,
+        )
+
+    def fake_get(book_id, primary=False):
+        if book_id != BOOK_ID:
+            return None
+        return {"_id": BOOK_ID, "title": "Meditations", "url": BOOK_URL}
+
+    def fake_save(book):
+        calls["save"] += 1
+        return {"matched": 1, "modified": 1, "upserted_id": None}
+
+    monkeypatch.setattr(refresh_service, "fetch_book_details", fake_fetch)
+    monkeypatch.setattr(refresh_service, "get_book_by_id", fake_get)
+    monkeypatch.setattr(refresh_service, "save_book_to_db", fake_save)
+    return calls
+
+
+def test_concurrent_refreshes_share_one_fetch(upstream):
+    """Test a burst of refreshes of one book costs a single upstream request"""
+    refresher = BookRefresher(ttl=60)
+
+    async def burst():
+        try:
+            first = await asyncio.gather(
+                *(refresher.refresh(BOOK_ID) for _ in range(10))
+            )
+            later = await refresher.refresh(BOOK_ID)
+            return first, later
+        finally:
+            await refresher.close()
+
+    first, later = asyncio.run(burst())
+
+    assert upstream == {"fetch": 1, "save": 1}
+    assert not any(result["cached"] for result in first)
+    assert later["cached"]
+    assert later["refreshed_at"] == first[0]["refreshed_at"]
+
+
+def test_refresh_after_ttl_fetches_again(upstream):
+    """Test an expired result is not reused"""
+    refresher = BookRefresher(ttl=0)
+
+    async def twice():
+        try:
+            await refresher.refresh(BOOK_ID)
+            return await refresher.refresh(BOOK_ID)
+        finally:
+            await refresher.close()
+
+    result = asyncio.run(twice())
+
+    assert upstream["fetch"] == 2
+    assert not result["cached"]
+
+
+def test_refresh_unknown_book(upstream):
+    """Test refreshing a book that does not exist raises BookNotFound"""
+    refresher = BookRefresher()
+
+    with pytest.raises(BookNotFound):
+        asyncio.run(refresher.refresh("65a0000000000000000000ff"))
+
+    assert upstream["fetch"] == 0
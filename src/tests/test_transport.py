@@ -0,0 +1,75 @@
+import asyncio
+from typing import Optional
+
+import pytest
+
+from crawler import transport
+from crawler.transport import ResponseTooLarge, read_body
+
+
+class FakeContent:
+    def __init__(self, chunks: list[bytes]):
+        self.chunks = chunks
+        self.read_chunks = 0
+
+    async def iter_chunked(self, size: int):
+        for chunk in self.chunks:
+            self.read_chunks += 1
+            yield chunk
+
+
+class FakeResponse:
+    url = "https://books.toscrape.com/index.html"
+
+    def __init__(self, chunks: list[bytes], content_length: Optional[int]):
+        self.content = FakeContent(chunks)
+        self.content_length = content_length
+
+    async def read(self) -> bytes:
+        return b"".join(self.content.chunks)
+
+
+@pytest.fixture
+def limit(monkeypatch):
+    monkeypatch.setattr(transport.settings, "max_response_bytes", 10)
+
+
+def test_body_is_read_whole_without_a_limit(monkeypatch):
+    """Test no limit is applied by default"""
+    monkeypatch.setattr(transport.settings, "max_response_bytes", 0)
+    response = FakeResponse([b"x" * 100], content_length=100)
+
+    assert asyncio.run(read_body(response)) == b"x" * 100
+
+
+def test_body_within_the_limit(limit):
+    """Test a body of exactly the limit is returned"""
+    response = FakeResponse([b"12345", b"67890"], content_length=None)
+
+    assert asyncio.run(read_body(response)) == b"1234567890"
+
+
+def test_declared_length_over_the_limit_is_rejected_unread(limit):
+    """Test a Content-Length above the limit fails before reading the body"""
+    response = FakeResponse([b"x" * 11], content_length=11)
+
+    with pytest.raises(ResponseTooLarge):
+        asyncio.run(read_body(response))
+    assert response.content.read_chunks == 0
+
+
+def test_streamed_body_over_the_limit_is_rejected(limit):
+    """Test bodies without a Content-Length stop at the chunk crossing the limit"""
+    response = FakeResponse([b"123456", b"789012", b"345"], content_length=None)
+
+    with pytest.raises(ResponseTooLarge):
+        asyncio.run(read_body(response))
+    assert response.content.read_chunks == 2
+
+
+def test_compressed_body_over_the_limit_is_rejected(limit):
+    """Test the limit applies to the decompressed body, not Content-Length"""
+    response = FakeResponse([b"x" * 8, b"x" * 8], content_length=5)
+
+    with pytest.raises(ResponseTooLarge):
+        asyncio.run(read_body(response))
@@ -0,0 +1,145 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+
+from database import db
+from database.models import BookRecord
+from src.api.routes import books as books_routes
+from src.database import migrations
+
+UPC = "4f19709e47883df5"
+
+
+def make_book(upc=UPC, title="Meditations", price="£25.89") -> BookRecord:
+    information = {"Price (excl. tax)": price}
+    if upc:
+        information = {"UPC": upc, **information}
+    return BookRecord.from_details(
+        {
+            "title": title,
+            "url": "https://books.toscrape.com/catalogue/meditations_33/index.html",
+            "cover": None,
+            "category": "Philosophy",
+            "ratings": 2,
+            "description": None,
+            "information": information,
+        }
+    )
+
+
+def legacy_book(price: float = 25.89, **fields) -> dict:
+    """A book as saved before the UPC became its identity"""
+    return {
+        "title": "Meditations",
+        "category": "Philosophy",
+        "price": price,
+        "information": {"UPC": UPC},
+        "scraped_at": datetime(2025, 1, 1),
+        **fields,
+    }
+
+
+def test_save_matches_on_upc(mongo):
+    """Test a book saved twice is updated in place and its price change logged"""
+    first = db.save_book_to_db(make_book())
+    second = db.save_book_to_db(make_book(title="Meditations (2nd ed.)", price="£20"))
+
+    (stored,) = mongo.books.find()
+    assert second["matched"] == 1 and second["upserted_id"] is None
+    assert str(stored["_id"]) == first["upserted_id"]
+    assert stored["title"] == "Meditations (2nd ed.)"
+    assert [c["change_type"] for c in mongo.changes.find()] == [
+        "new_book",
+        "price_change",
+    ]
+
+
+def test_save_backfills_upc_on_legacy_book(mongo):
+    """Test a pre-migration book is matched on title/category and gets its UPC"""
+    legacy_id = mongo.books.insert_one(legacy_book()).inserted_id
+
+    result = db.save_book_to_db(make_book(price="£19.99"))
+
+    (stored,) = mongo.books.find()
+    assert stored["_id"] == legacy_id and stored["upc"] == UPC
+    assert result["upserted_id"] is None
+    (change,) = mongo.changes.find()
+    assert change["book_id"] == str(legacy_id)
+    assert (change["old_value"], change["new_value"]) == (25.89, 19.99)
+
+
+def test_batch_backfills_upc_on_legacy_books(mongo):
+    """Test the batch path matches pre-migration books in one extra query"""
+    legacy_id = mongo.books.insert_one(legacy_book()).inserted_id
+    other_upc = "4165285e1663650f"
+
+    # New books go first: mongomock numbers upserts by their own position
+    result = db.save_books_batch([make_book(other_upc, "Sapiens"), make_book()])
+
+    assert result == {"inserted": 1, "updated": 1, "errors": 0, "total": 2}
+    assert mongo.books.find_one({"upc": UPC})["_id"] == legacy_id
+    assert mongo.books.count_documents({"upc": {"$exists": False}}) == 0
+    assert [c["change_type"] for c in mongo.changes.find()] == ["new_book"]
+
+
+def test_books_without_upc_stay_unique(mongo):
+    """Test books without a UPC are upserted on title/category, once"""
+    db.save_books_batch([make_book(upc=None)])
+    db.save_book_to_db(make_book(upc=None, price="£10"))
+
+    (stored,) = mongo.books.find()
+    assert "upc" not in stored and stored["price"] == 10
+    with pytest.raises(DuplicateKeyError):
+        mongo.books.insert_one({"title": "Meditations", "category": "Philosophy"})
+
+
+def test_books_with_distinct_upcs_may_share_a_title(mongo):
+    """Test the title/category index only applies to books without a UPC"""
+    db.save_book_to_db(make_book())
+    db.save_book_to_db(make_book(upc="4165285e1663650f"))
+
+    assert mongo.books.count_documents({"title": "Meditations"}) == 2
+
+
+def test_migration_backfills_merges_and_swaps_indexes(mongo):
+    """Test the UPC migration on a database in its pre-UPC shape"""
+    mongo.books.drop_indexes()
+    mongo.books.create_index([("title", 1), ("category", 1)], unique=True)
+    newest = mongo.books.insert_one(
+        legacy_book(scraped_at=datetime(2025, 3, 1))
+    ).inserted_id
+    stale = mongo.books.insert_one(
+        legacy_book(category="Classics", scraped_at=datetime(2025, 2, 1))
+    ).inserted_id
+    mongo.books.insert_one(legacy_book(title="Untitled", information={}))
+    mongo.changes.insert_one({"book_id": str(stale), "change_type": "new_book"})
+
+    result = migrations.migrate_upc_identity()
+
+    assert result == {"backfilled": 2, "merged": 1}
+    assert mongo.books.find_one({"upc": UPC})["_id"] == newest
+    assert mongo.books.find_one({"_id": stale}) is None
+    assert mongo.changes.find_one()["book_id"] == str(newest)
+    indexes = mongo.books.index_information()
+    assert "title_1_category_1" not in indexes
+    assert {"upc_1", "title_1_category_1_without_upc"} <= indexes.keys()
+
+
+def test_book_by_upc(mongo):
+    """Test the UPC route returns the stored book and 404s unknown UPCs"""
+    book_id = mongo.books.insert_one({"upc": UPC, "title": "Meditations"}).inserted_id
+
+    def get(upc):
+        return asyncio.run(books_routes.get_book_upc(None, upc=upc, api_key="key"))
+
+    assert get(UPC) == {
+        "_id": str(book_id),
+        "upc": UPC,
+        "title": "Meditations",
+    }
+    with pytest.raises(HTTPException) as error:
+        get("0000000000000000")
+    assert error.value.status_code == 404
@@ -0,0 +1,128 @@
+import os
+import time
+from contextlib import asynccontextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    push_to_gateway,
+)
+from prometheus_client.multiprocess import MultiProcessCollector
+from pymongo import monitoring
+
+# Crawler
+
+FETCH_SECONDS = Histogram(
+    "crawler_fetch_seconds",
+    "Time spent downloading a page, by page type",
+    ["page_type"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+RESPONSES_TOTAL = Counter(
+    "crawler_responses_total",
+    "Fetch outcomes by page type and HTTP status (or timeout/error)",
+    ["page_type", "status"],
+)
+BYTES_DOWNLOADED = Counter(
+    "crawler_bytes_downloaded_total",
+    "Response body bytes downloaded, by page type",
+    ["page_type"],
+)
+PARSE_SECONDS = Histogram(
+    "crawler_parse_seconds",
+    "Time spent parsing a downloaded page, by page type",
+    ["page_type"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5),
+)
+SEMAPHORE_WAIT_SECONDS = Histogram(
+    "crawler_semaphore_wait_seconds",
+    "Time spent waiting for a free request slot",
+    buckets=(0.001, 0.01, 0.1, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_WRITE_SECONDS = Histogram(
+    "crawler_db_write_seconds",
+    "Time spent writing a batch of books to MongoDB",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+DB_BATCH_SIZE = Histogram(
+    "crawler_db_batch_size",
+    "Number of books per MongoDB write batch",
+    buckets=(1, 5, 10, 20, 50, 100, 500),
+)
+CRAWL_DURATION_SECONDS = Histogram(
+    "crawler_run_duration_seconds",
+    "Duration of complete crawl runs",
+    buckets=(30, 60, 120, 300, 600, 1200, 3600),
+)
+BOOKS_SCRAPED = Counter("crawler_books_scraped_total", "Books scraped")
+
+# API
+
+REQUEST_SECONDS = Histogram(
+    "api_request_seconds",
+    "API request latency by endpoint",
+    ["method", "endpoint", "status"],
+)
+MONGO_COMMAND_SECONDS = Histogram(
+    "mongo_command_seconds",
+    "MongoDB command latency by command name",
+    ["command", "outcome"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+
+
+@asynccontextmanager
+async def acquire_slot(semaphore):
+    """Acquire the crawler semaphore, recording how long the wait took"""
+    start = time.perf_counter()
+    async with semaphore:
+        SEMAPHORE_WAIT_SECONDS.observe(time.perf_counter() - start)
+        yield
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Record the latency of every MongoDB command issued by a client"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_SECONDS.labels(event.command_name, "success").observe(
+            event.duration_micros / 1_000_000
+        )
+
+    def failed(self, event):
+        MONGO_COMMAND_SECONDS.labels(event.command_name, "failure").observe(
+            event.duration_micros / 1_000_000
+        )
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """
+    Render metrics in the Prometheus text format
+
+    When running several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR so
+    metrics from every worker are aggregated.
+    """
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def push_metrics(job: str):
+    """Push metrics to the Prometheus Pushgateway at PROMETHEUS_PUSHGATEWAY_URL"""
+    gateway = os.getenv("PROMETHEUS_PUSHGATEWAY_URL")
+    if not gateway:
+        return
+
+    try:
+        push_to_gateway(gateway, job=job, registry=REGISTRY)
+    except OSError as e:
+        print(f"Error pushing metrics to {gateway}: {e}")
@@ -0,0 +1,248 @@
+"""
+Opt-in profiling for crawl runs and API requests
+
+Configured through environment variables:
+
+- PROFILE_DIR: where profiles are written (default "profiles")
+- PROFILE_CRAWLS: "true" to profile every crawl
+- PROFILE_SAMPLE_RATE: fraction of API requests to profile (default 0)
+- PROFILE_ROUTES: comma-separated path prefixes eligible for request
+  profiling, e.g. "/books,/changes" (default: every path)
+- PROFILE_HEADER: "true" to also profile requests sent with `X-Profile: 1`
+- PROFILE_MAX_PER_MINUTE: cap on request profiles per process (default 6)
+- PROFILE_INTERVAL: sampling interval in seconds (default 0.001)
+
+When pyinstrument is installed (`uv sync --extra profiling`) profiles are
+taken with its sampling profiler in async mode, which attributes time spent
+awaiting to the awaiting coroutine and ignores other requests sharing the
+event loop, and are written as collapsed stacks (`.collapsed`, for
+flamegraph tools). Otherwise cProfile is used and `.pstats` files are
+written; those include every coroutine that ran on the event loop while the
+request was being profiled.
+"""
+
+import cProfile
+import functools
+import inspect
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PROFILE_HEADER = "X-Profile"
+
+
+@dataclass
+class ProfileSettings:
+    directory: str = "profiles"
+    crawls: bool = False
+    sample_rate: float = 0.0
+    routes: tuple[str, ...] = ()
+    header: bool = False
+    max_per_minute: int = 6
+    interval: float = 0.001
+
+    @classmethod
+    def from_env(cls) -> "ProfileSettings":
+        routes = os.getenv("PROFILE_ROUTES", "")
+        return cls(
+            directory=os.getenv("PROFILE_DIR", "profiles"),
+            crawls=os.getenv("PROFILE_CRAWLS", "false").lower() == "true",
+            sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+            routes=tuple(route for route in routes.split(",") if route),
+            header=os.getenv("PROFILE_HEADER", "false").lower() == "true",
+            max_per_minute=int(os.getenv("PROFILE_MAX_PER_MINUTE", "6")),
+            interval=float(os.getenv("PROFILE_INTERVAL", "0.001")),
+        )
+
+
+settings = ProfileSettings.from_env()
+
+# Only one profile runs at a time per process, which bounds the overhead and
+# avoids cProfile's restriction on concurrent profilers
+_active = threading.Lock()
+_recent: deque[float] = deque()
+
+
+def _within_budget() -> bool:
+    """Count a profile against PROFILE_MAX_PER_MINUTE, if there is room left"""
+    now = time.monotonic()
+    while _recent and now - _recent[0] > 60:
+        _recent.popleft()
+    if len(_recent) >= settings.max_per_minute:
+        return False
+    _recent.append(now)
+    return True
+
+
+class _CProfileBackend:
+    extension = "pstats"
+
+    def __init__(self, async_mode: bool):
+        self._profiler = cProfile.Profile()
+
+    def start(self):
+        self._profiler.enable()
+
+    def stop(self):
+        self._profiler.disable()
+
+    def write(self, path: str):
+        self._profiler.dump_stats(path)
+
+
+class _SamplingBackend:
+    extension = "collapsed"
+
+    def __init__(self, async_mode: bool):
+        from pyinstrument import Profiler
+
+        self._profiler = Profiler(
+            interval=settings.interval,
+            async_mode="enabled" if async_mode else "disabled",
+        )
+
+    def start(self):
+        self._profiler.start()
+
+    def stop(self):
+        self._profiler.stop()
+
+    def write(self, path: str):
+        root = (
+            self._profiler.last_session.root_frame()
+            if self._profiler.last_session
+            else None
+        )
+        lines = []
+        if root is not None:
+            _collapse(root, [], lines)
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def _collapse(frame, stack: list[str], lines: list[str]):
+    """Append `frame;child;... <microseconds>` lines for a pyinstrument frame tree"""
+    name = f"{frame.function} ({frame.file_path_short}:{frame.line_no})"
+    stack = stack + [name.replace(";", ":")]
+    self_time = frame.total_self_time
+    if self_time > 0:
+        lines.append(f"{';'.join(stack)} {round(self_time * 1_000_000)}")
+    for child in frame.children:
+        _collapse(child, stack, lines)
+
+
+def _backend(async_mode: bool):
+    try:
+        return _SamplingBackend(async_mode)
+    except ImportError:
+        return _CProfileBackend(async_mode)
+
+
+@contextmanager
+def profile(name: str, async_mode: bool = False, rate_limited: bool = False):
+    """
+    Profile the enclosed block and write the result to PROFILE_DIR
+
+    Yields the path the profile will be written to, or None when another
+    profile is already running and this block is not profiled. With
+    `rate_limited`, the block is also left unprofiled once
+    PROFILE_MAX_PER_MINUTE profiles have been taken; profiles skipped because
+    another one was running do not count.
+    """
+    if not _active.acquire(blocking=False):
+        yield None
+        return
+
+    try:
+        if rate_limited and not _within_budget():
+            yield None
+            return
+
+        backend = _backend(async_mode)
+        timestamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "-", name).strip("-")
+        path = os.path.join(
+            settings.directory,
+            f"{slug}-{timestamp}-{uuid.uuid4().hex[:8]}.{backend.extension}",
+        )
+
+        backend.start()
+        try:
+            yield path
+        finally:
+            backend.stop()
+            os.makedirs(settings.directory, exist_ok=True)
+            backend.write(path)
+            print(f"✓ Profile written to {path}")
+    finally:
+        _active.release()
+
+
+def profiled_crawl(func):
+    """
+    Profile a crawl entry point when PROFILE_CRAWLS is enabled
+
+    Coroutine functions are profiled from inside the event loop in async
+    mode, so time spent awaiting is attributed to the awaiting coroutine.
+    """
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if not settings.crawls:
+                return await func(*args, **kwargs)
+
+            with profile(f"crawl-{func.__name__}", async_mode=True):
+                return await func(*args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not settings.crawls:
+            return func(*args, **kwargs)
+
+        with profile(f"crawl-{func.__name__}"):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def _should_profile_request(path: str, header: Optional[str]) -> bool:
+    if settings.routes and not path.startswith(settings.routes):
+        return False
+
+    requested = settings.header and header == "1"
+    sampled = settings.sample_rate > 0 and random.random() < settings.sample_rate
+    return requested or sampled
+
+
+async def profile_requests(request, call_next):
+    """HTTP middleware profiling sampled or explicitly requested API calls"""
+    if not _should_profile_request(
+        request.url.path, request.headers.get(PROFILE_HEADER)
+    ):
+        return await call_next(request)
+
+    with profile(
+        f"request-{request.method}-{request.url.path}",
+        async_mode=True,
+        rate_limited=True,
+    ) as path:
+        response = await call_next(request)
+
+    if path is not None:
+        response.headers["X-Profile-Id"] = os.path.basename(path)
+    return response
@@ -1,3 +1,6 @@
+import re
+from urllib.parse import urljoin
+
 from bs4 import BeautifulSoup
 
 from src.utils.urls import get_full_html
@@ -31,3 +34,49 @@ def parse_category(book: BeautifulSoup):
     category = breadcrumbs[-2].find("a").text
 
     return category
+
+
+def parse_page_count(page: BeautifulSoup):
+    """Total pages of a listing from its "Page 1 of N" pager, if present"""
+    current = page.select_one("li.current")
+    if current is None:
+        return None
+
+    match = re.search(r"Page\s+\d+\s+of\s+(\d+)", current.get_text())
+    if match:
+        return int(match.group(1))
+
+    return None
+
+
+def parse_book_details(book: BeautifulSoup, url: str) -> dict:
+    """Extract a book's fields from its detail page, fetched from `url`"""
+    title = book.find("h1").text
+    cover = urljoin(url, book.find("img")["src"])
+    category = parse_category(book)
+    ratings = parse_ratings(book)
+    description = book.find("meta", attrs={"name": "description"}).get("content")
+
+    table = book.find("table")
+    information = {}
+
+    for row in table.find_all("tr"):
+        columns = row.find_all(["th", "td"])
+        if len(columns) == 2:
+            key = columns[0].text.strip()
+            value = columns[1].text.strip()
+
+            if "Price" in key or key == "Tax":
+                value = value.replace("Â£", "£")
+
+            information[key] = value
+
+    return {
+        "title": title,
+        "url": url,
+        "cover": cover,
+        "category": category,
+        "ratings": ratings,
+        "description": description,
+        "information": information,
+    }